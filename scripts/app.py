@@ -5,6 +5,7 @@ A comprehensive business intelligence dashboard for revenue forecasting and scen
 
 import sys
 import os
+import calendar
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 import streamlit as st
@@ -15,17 +16,11 @@ from datetime import datetime, timedelta
 # Import custom modules
 try:
     from src.data_processing import (
-        load_data, engineer_features, get_feature_columns, split_train_test
+        DATA_FILES, load_processed_data, get_feature_columns, split_train_test,
+        downcast_features, top_families_by_sales
     )
     from src.modeling import (
-        train_xgboost, evaluate_model, get_feature_importance
-    )
-    from src.visualization import (
-        plot_forecast_comparison, plot_residuals, plot_feature_importance,
-        plot_seasonality_analysis
-    )
-    from src.export_functions import (
-        create_excel_forecast_report, create_csv_export
+        train_xgboost, evaluate_model, get_feature_importance, apply_scenario
     )
     from src.statistical_analysis import (
         calculate_confidence_interval, test_promotion_impact, test_holiday_impact,
@@ -37,17 +32,11 @@ except ImportError:
     # Fallback for direct execution
     sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
     from src.data_processing import (
-        load_data, engineer_features, get_feature_columns, split_train_test
+        DATA_FILES, load_processed_data, get_feature_columns, split_train_test,
+        downcast_features, top_families_by_sales
     )
     from src.modeling import (
-        train_xgboost, evaluate_model, get_feature_importance
-    )
-    from src.visualization import (
-        plot_forecast_comparison, plot_residuals, plot_feature_importance,
-        plot_seasonality_analysis
-    )
-    from src.export_functions import (
-        create_excel_forecast_report, create_csv_export
+        train_xgboost, evaluate_model, get_feature_importance, apply_scenario
     )
     from src.statistical_analysis import (
         calculate_confidence_interval, test_promotion_impact, test_holiday_impact,
@@ -92,41 +81,61 @@ st.markdown("""
 # ===============================
 # DATA LOADING & PROCESSING
 # ===============================
-@st.cache_data
-def load_and_process_data():
-    """Load and process all data with caching."""
+DATA_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+def get_data_mtimes(data_path):
+    """Modification times of the source CSVs (None for a missing file)."""
+    mtimes = []
+    for name in DATA_FILES:
+        try:
+            mtimes.append(os.path.getmtime(os.path.join(data_path, name)))
+        except OSError:
+            mtimes.append(None)
+    return tuple(mtimes)
+
+@st.cache_data(show_spinner=False)
+def load_and_process_data(data_path, mtimes):
+    """Load and process all data with caching; editing a CSV changes mtimes and reloads."""
     try:
-        # Get the correct data path
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        data_path = os.path.join(os.path.dirname(script_dir), "data")
-        sales_raw, oil, holidays = load_data(data_path)
-        df = engineer_features(sales_raw, oil, holidays)
-        return df, sales_raw
+        return load_processed_data(data_path)
     except Exception as e:
         st.error(f"Error loading data: {str(e)}")
         st.error("Please ensure data files are in the 'data/' directory.")
         st.stop()
 
 # Load data
+data_mtimes = get_data_mtimes(DATA_PATH)
 with st.spinner("Loading and processing data..."):
-    df, sales_raw = load_and_process_data()
+    df, sales_raw = load_and_process_data(DATA_PATH, data_mtimes)
 
 feature_cols = get_feature_columns()
 
 # Train-test split
 train, test = split_train_test(df, split_date="2017-01-01")
-X_train = train[feature_cols]
+X_train = downcast_features(train[feature_cols])
 y_train = train["sales"]
-X_test = test[feature_cols]
+X_test = downcast_features(test[feature_cols])
 y_test = test["sales"]
+y_test_np = y_test.to_numpy()
 
 # ===============================
 # MODEL TRAINING
 # ===============================
 @st.cache_resource
-def get_trained_models(_X_train, _y_train, _feature_cols, test_size):
-    """Train and cache models."""
-    xgb_model = train_xgboost(_X_train, _y_train)
+def get_trained_models(_X_train, _y_train, _feature_cols, test_size, data_key):
+    """Train and cache models; data_key (source mtimes) retrains on a data reload."""
+    # Pick the number of rounds by early-stopping on the tail of the training
+    # window, so the test period stays unseen
+    n_val = max(1, len(_X_train) // 10)
+    probe_model = train_xgboost(
+        _X_train.iloc[:-n_val], _y_train.iloc[:-n_val],
+        eval_set=[(_X_train.iloc[-n_val:], _y_train.iloc[-n_val:])],
+        early_stopping_rounds=20
+    )
+    # Refit on the full window so the final model sees the days just
+    # before the test period
+    xgb_model = train_xgboost(_X_train, _y_train,
+                              n_estimators=probe_model.best_iteration + 1)
     
     # Baseline predictions using lag_1 feature
     baseline_pred = _X_train["lag_1"].values[-test_size:]
@@ -138,7 +147,62 @@ def get_trained_models(_X_train, _y_train, _feature_cols, test_size):
     
     return xgb_model, baseline_pred
 
-xgb_model, baseline_pred = get_trained_models(X_train, y_train, feature_cols, len(X_test))
+xgb_model, baseline_pred = get_trained_models(X_train, y_train, feature_cols, len(X_test),
+                                               data_mtimes)
+
+@st.cache_resource
+def get_prediction_booster(_xgb_model, model_id):
+    """Booster truncated to the early-stopping best iteration, as XGBRegressor.predict uses."""
+    booster = _xgb_model.get_booster()
+    best_iteration = getattr(_xgb_model, "best_iteration", None)
+    if best_iteration is not None:
+        booster = booster[:best_iteration + 1]
+    # Prediction batches are small; extra OpenMP threads only add overhead
+    booster.set_param({"nthread": 1})
+    return booster
+
+booster = get_prediction_booster(xgb_model, id(xgb_model))
+
+@st.cache_resource
+def get_scenario_matrix(_X, data_key, cols):
+    """
+    Cache a contiguous float32 copy of the test features for scenario scoring.
+    Keyed on the source mtimes rather than hashing the frame; the array is
+    shared across sessions, so it is made read-only.
+    """
+    X_np = np.ascontiguousarray(_X.to_numpy(), dtype=np.float32)
+    X_np.flags.writeable = False
+    return X_np, cols.index("promo_count"), cols.index("oil_price")
+
+X_test_np, promo_idx, oil_idx = get_scenario_matrix(X_test, data_mtimes, feature_cols)
+
+@st.cache_data(show_spinner=False)
+def cached_predict(_booster, model_id, X):
+    """
+    Cache test-set predictions; inplace_predict skips DMatrix construction.
+    model_id keys the cache on the booster, which isn't hashed.
+    """
+    return _booster.inplace_predict(X)
+
+# Identifies the data and model the cached results below were computed from
+source_id = (data_mtimes, id(booster))
+
+# One inference pass per session, shared by every page; recomputed when the
+# data or model is reloaded
+if st.session_state.get("xgb_pred_source") != source_id:
+    st.session_state["xgb_pred_full"] = cached_predict(booster, id(booster), X_test_np)
+    st.session_state["xgb_pred_source"] = source_id
+xgb_pred_full = st.session_state["xgb_pred_full"]
+
+@st.cache_data(show_spinner=False)
+def cached_metrics(y_true, y_pred):
+    """Cache evaluation metrics for a pair of actual/predicted arrays."""
+    return evaluate_model(y_true, y_pred)
+
+@st.cache_data(show_spinner=False)
+def cached_importance(_model, model_id, cols):
+    """Cache feature importance for the trained model."""
+    return get_feature_importance(_model, list(cols))
 
 # ===============================
 # SIDEBAR
@@ -161,124 +225,120 @@ def get_database(_df):
 
 db = get_database(df)
 
+@st.cache_data(ttl=30)
+def get_database_tabs(_db):
+    """Read all Database page tables in one connection; cached briefly so tab switches skip SQLite."""
+    return _db.get_all_tabs_bulk()
+
 # Navigation
 page = st.sidebar.selectbox(
     "Select Page",
     ["📈 Overview", "🔮 Forecasting", "📊 Model Analysis", "📈 Statistical Analysis", "💼 Business Insights", "💾 Database"]
 )
 
-# Scenario controls (for Forecasting page)
+# Scenario controls (promotion and oil sliders live on the Forecasting page)
 st.sidebar.markdown("---")
 st.sidebar.subheader("Scenario Parameters")
 
-promo_change = st.sidebar.slider(
-    "Promotions Change (%)", -50, 100, 0,
-    help="Percentage change in promotion volume"
-)
-oil_change = st.sidebar.slider(
-    "Oil Price Change (%)", -30, 30, 0,
-    help="Percentage change in oil prices"
-)
+# Re-assigning keeps the Forecasting page slider values across page switches
+for scenario_key in ("promo_change", "oil_change"):
+    st.session_state[scenario_key] = st.session_state.get(scenario_key, 0)
+
 forecast_days = st.sidebar.slider(
     "Forecast Horizon (days)", 7, 90, 30,
     help="Number of days to forecast ahead"
 )
 
-# ===============================
-# OVERVIEW PAGE
-# ===============================
-if page == "📈 Overview":
-    st.markdown('<h1 class="main-header">📊 Revenue Forecasting Dashboard</h1>', 
-                unsafe_allow_html=True)
-    
-    st.markdown("---")
-    
-    # Key Metrics
-    col1, col2, col3, col4 = st.columns(4)
-    
-    total_sales = df["sales"].sum()
-    avg_daily_sales = df["sales"].mean()
-    peak_sales = df["sales"].max()
-    peak_date = df["sales"].idxmax()
-    
-    with col1:
-        st.metric("Total Revenue", f"${total_sales:,.0f}")
-    with col2:
-        st.metric("Avg Daily Sales", f"${avg_daily_sales:,.0f}")
-    with col3:
-        st.metric("Peak Sales Day", f"${peak_sales:,.0f}")
-    with col4:
-        st.metric("Date Range", f"{df.index.min().strftime('%Y-%m-%d')} to {df.index.max().strftime('%Y-%m-%d')}")
-    
-    st.markdown("---")
-    
-    # Historical Sales Trend
-    st.subheader("📈 Historical Sales Trend")
-    
-    fig_overview = plot_forecast_comparison(
-        train.index, train["sales"],
-        test.index[:forecast_days], 
-        y_test[:forecast_days],
-        baseline_pred[:forecast_days],
-        title="Historical Sales Performance"
-    )
-    st.plotly_chart(fig_overview, use_container_width=True)
-    
-    # Seasonal Analysis
-    st.subheader("🔄 Seasonality Patterns")
-    fig_season = plot_seasonality_analysis(df)
-    st.plotly_chart(fig_season, use_container_width=True)
-    
-    # Data Summary
-    col1, col2 = st.columns(2)
-    with col1:
-        st.subheader("📋 Dataset Summary")
-        summary_stats = pd.DataFrame({
-            "Metric": ["Total Records", "Date Range", "Avg Daily Sales", 
-                      "Total Stores", "Product Families"],
-            "Value": [
-                str(len(df)),
-                f"{df.index.min().strftime('%Y-%m-%d')} to {df.index.max().strftime('%Y-%m-%d')}",
-                f"${avg_daily_sales:,.0f}",
-                str(sales_raw["store_nbr"].nunique()),
-                str(sales_raw["family"].nunique())
-            ]
-        })
-        st.dataframe(summary_stats, use_container_width=True, hide_index=True)
-    
-    with col2:
-        st.subheader("📊 Top Product Categories")
-        # Get top families by sales
-        top_families = sales_raw.groupby("family")["sales"].sum().sort_values(ascending=False).head(10)
-        families_df = pd.DataFrame({
-            "Product Family": top_families.index,
-            "Total Sales": [f"${x:,.0f}" for x in top_families.values]
-        })
-        st.dataframe(families_df, use_container_width=True, hide_index=True)
+@st.cache_data(show_spinner=False)
+def get_overview_aggregates(df, _sales_raw):
+    """
+    Cache Overview page aggregates. Keyed on the processed frame only, which
+    changes whenever the raw sales data does.
+    """
+    sales = df["sales"].to_numpy()
+    return {
+        "total_sales": sales.sum(),
+        "avg_daily_sales": sales.mean(),
+        "peak_sales": sales.max(),
+        "n_stores": _sales_raw["store_nbr"].nunique(),
+        "n_families": _sales_raw["family"].nunique(),
+        "top_families": top_families_by_sales(_sales_raw, n=10)
+    }
 
-# ===============================
-# FORECASTING PAGE
-# ===============================
-elif page == "🔮 Forecasting":
-    st.markdown('<h1 class="main-header">🔮 Revenue Forecasting & Scenario Analysis</h1>', 
-                unsafe_allow_html=True)
+@st.cache_data(show_spinner=False)
+def get_scenario_metrics(forecast_days, promo_change, oil_change, source_id, _y_true, _y_pred):
+    """
+    Cache Forecasting page metrics per scenario. For a given data/model
+    source_id, scenario predictions are fully determined by the slider
+    values, so the arrays don't need hashing.
+    """
+    return evaluate_model(_y_true, _y_pred)
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def build_excel_report(forecast_df, actual_df, metrics_items, scenario_items):
+    """Cache the Excel report bytes; dict inputs are passed as item tuples."""
+    from src.export_functions import create_excel_forecast_report
+    return create_excel_forecast_report(
+        forecast_df, actual_df, dict(metrics_items), dict(scenario_items)
+    ).getvalue()
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def build_csv_export(forecast_df):
+    """Cache the CSV export for a forecast."""
+    from src.export_functions import create_csv_export
+    return create_csv_export(forecast_df, "forecast")
+
+fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", lambda func: func)
+
+@fragment
+def forecasting_page(forecast_days):
+    """
+    Forecasting page body. Runs as a fragment so moving the scenario sliders
+    reruns only this function rather than the whole script.
+    """
+    from src.visualization import plot_forecast_comparison
+    
+    slider_col1, slider_col2 = st.columns(2)
+    with slider_col1:
+        promo_change = st.slider(
+            "Promotions Change (%)", -50, 100, key="promo_change",
+            help="Percentage change in promotion volume"
+        )
+    with slider_col2:
+        oil_change = st.slider(
+            "Oil Price Change (%)", -30, 30, key="oil_change",
+            help="Percentage change in oil prices"
+        )
     
     st.markdown("---")
     
-    # Apply scenario changes
-    scenario_df = X_test.copy()
-    scenario_df["promo_count"] = scenario_df["promo_count"] * (1 + promo_change / 100)
-    scenario_df["oil_price"] = scenario_df["oil_price"] * (1 + oil_change / 100)
-    
-    # Ensure lag features are properly updated (simplified for demo)
-    # In production, you'd need to recalculate these based on scenario
+    # Slice the horizon once; NumPy slices are views, not copies
+    y_h = y_test_np[:forecast_days]
+    dates_h = test.index[:forecast_days]
     
-    scenario_pred = xgb_model.predict(scenario_df)
+    if promo_change == 0 and oil_change == 0:
+        # Unchanged inputs: reuse the shared test-set predictions
+        scenario_pred = xgb_pred_full
+    else:
+        # Apply scenario changes into a per-session scratch buffer
+        scenario_X = st.session_state.get("scenario_X")
+        if scenario_X is None or scenario_X.shape != X_test_np.shape:
+            scenario_X = st.session_state["scenario_X"] = np.empty_like(X_test_np)
+        apply_scenario(scenario_X, X_test_np, promo_idx, oil_idx,
+                       1 + promo_change / 100, 1 + oil_change / 100)
+        
+        # Ensure lag features are properly updated (simplified for demo)
+        # In production, you'd need to recalculate these based on scenario
+        
+        scenario_pred = booster.inplace_predict(scenario_X)
+    pred_h = scenario_pred[:forecast_days]
     baseline_scenario = baseline_pred[:forecast_days]
+    scenario_metrics = get_scenario_metrics(forecast_days, promo_change, oil_change, source_id,
+                                            y_h, pred_h)
     
     # Calculate business metrics
     baseline_revenue = baseline_scenario.sum()
-    scenario_revenue = scenario_pred[:forecast_days].sum()
+    scenario_revenue = pred_h.sum()
     revenue_impact = scenario_revenue - baseline_revenue
     revenue_impact_pct = (revenue_impact / baseline_revenue * 100) if baseline_revenue > 0 else 0
     
@@ -298,14 +358,14 @@ elif page == "🔮 Forecasting":
             delta=f"${revenue_impact:,.0f} ({revenue_impact_pct:.2f}%)"
         )
     with col3:
-        actual_revenue = y_test[:forecast_days].sum()
+        actual_revenue = y_h.sum()
         st.metric(
             "Actual Revenue",
             f"${actual_revenue:,.0f}",
             delta=f"${scenario_revenue - actual_revenue:,.0f}"
         )
     with col4:
-        mape = evaluate_model(y_test[:forecast_days], scenario_pred[:forecast_days])["MAPE"]
+        mape = scenario_metrics["MAPE"]
         st.metric(
             "Forecast Accuracy (MAPE)",
             f"{mape:.2f}%",
@@ -318,10 +378,10 @@ elif page == "🔮 Forecasting":
     st.subheader("📊 Forecast Comparison")
     
     fig_forecast = plot_forecast_comparison(
-        train.index[-90:], train["sales"][-90:],
-        test.index[:forecast_days],
-        y_test[:forecast_days],
-        scenario_pred[:forecast_days],
+        train.index[-90:], train["sales"].to_numpy()[-90:],
+        dates_h,
+        y_h,
+        pred_h,
         title=f"Revenue Forecast - {forecast_days} Day Horizon"
     )
     st.plotly_chart(fig_forecast, use_container_width=True)
@@ -335,15 +395,15 @@ elif page == "🔮 Forecasting":
     with export_col1:
         # Prepare data for export
         forecast_export_df = pd.DataFrame({
-            'date': test.index[:forecast_days],
-            'forecast': scenario_pred[:forecast_days]
+            'date': dates_h,
+            'forecast': pred_h
         })
         actual_export_df = pd.DataFrame({
-            'date': test.index[:forecast_days],
-            'actual': y_test[:forecast_days].values if len(y_test) >= forecast_days else y_test.values
+            'date': dates_h,
+            'actual': y_h
         })
         
-        metrics_export = evaluate_model(y_test[:forecast_days], scenario_pred[:forecast_days])
+        metrics_export = scenario_metrics
         scenario_params_export = {
             'Promotions Change': f"{promo_change}%",
             'Oil Price Change': f"{oil_change}%",
@@ -351,11 +411,11 @@ elif page == "🔮 Forecasting":
         }
         
         # Excel Export
-        excel_file = create_excel_forecast_report(
+        excel_file = build_excel_report(
             forecast_export_df,
             actual_export_df,
-            metrics_export,
-            scenario_params_export
+            tuple(metrics_export.items()),
+            tuple(scenario_params_export.items())
         )
         st.download_button(
             label="📊 Download Excel Report",
@@ -366,7 +426,7 @@ elif page == "🔮 Forecasting":
     
     with export_col2:
         # CSV Export
-        csv_data = create_csv_export(forecast_export_df, "forecast")
+        csv_data = build_csv_export(forecast_export_df)
         st.download_button(
             label="📄 Download CSV",
             data=csv_data,
@@ -381,8 +441,8 @@ elif page == "🔮 Forecasting":
             try:
                 # Save forecasts
                 forecast_save_df = pd.DataFrame({
-                    'date': test.index[:forecast_days],
-                    'forecast': scenario_pred[:forecast_days]
+                    'date': dates_h,
+                    'forecast': pred_h
                 })
                 db.save_bulk_forecasts(forecast_save_df, model_type="XGBoost", scenario_name=scenario_name)
                 
@@ -392,6 +452,7 @@ elif page == "🔮 Forecasting":
                 # Save model performance
                 db.save_model_performance("XGBoost", mape, metrics_export.get("RMSE", 0), 
                                          metrics_export.get("MAE", 0), metrics_export.get("R2", 0))
+                get_database_tabs.clear()
                 
                 st.success(f"✅ Scenario '{scenario_name}' saved to database!")
             except Exception as e:
@@ -433,21 +494,108 @@ elif page == "🔮 Forecasting":
         })
         st.dataframe(scenario_params, use_container_width=True, hide_index=True)
 
+# ===============================
+# OVERVIEW PAGE
+# ===============================
+if page == "📈 Overview":
+    from src.visualization import plot_forecast_comparison, plot_seasonality_analysis
+    
+    st.markdown('<h1 class="main-header">📊 Revenue Forecasting Dashboard</h1>', 
+                unsafe_allow_html=True)
+    
+    st.markdown("---")
+    
+    # Key Metrics
+    col1, col2, col3, col4 = st.columns(4)
+    
+    overview = get_overview_aggregates(df, sales_raw)
+    total_sales = overview["total_sales"]
+    avg_daily_sales = overview["avg_daily_sales"]
+    peak_sales = overview["peak_sales"]
+    
+    with col1:
+        st.metric("Total Revenue", f"${total_sales:,.0f}")
+    with col2:
+        st.metric("Avg Daily Sales", f"${avg_daily_sales:,.0f}")
+    with col3:
+        st.metric("Peak Sales Day", f"${peak_sales:,.0f}")
+    with col4:
+        st.metric("Date Range", f"{df.index.min().strftime('%Y-%m-%d')} to {df.index.max().strftime('%Y-%m-%d')}")
+    
+    st.markdown("---")
+    
+    # Historical Sales Trend
+    st.subheader("📈 Historical Sales Trend")
+    
+    fig_overview = plot_forecast_comparison(
+        train.index, train["sales"].to_numpy(),
+        test.index[:forecast_days], 
+        y_test_np[:forecast_days],
+        baseline_pred[:forecast_days],
+        title="Historical Sales Performance"
+    )
+    st.plotly_chart(fig_overview, use_container_width=True)
+    
+    # Seasonal Analysis
+    st.subheader("🔄 Seasonality Patterns")
+    fig_season = plot_seasonality_analysis(df)
+    st.plotly_chart(fig_season, use_container_width=True)
+    
+    # Data Summary
+    col1, col2 = st.columns(2)
+    with col1:
+        st.subheader("📋 Dataset Summary")
+        summary_stats = pd.DataFrame({
+            "Metric": ["Total Records", "Date Range", "Avg Daily Sales", 
+                      "Total Stores", "Product Families"],
+            "Value": [
+                str(len(df)),
+                f"{df.index.min().strftime('%Y-%m-%d')} to {df.index.max().strftime('%Y-%m-%d')}",
+                f"${avg_daily_sales:,.0f}",
+                str(overview["n_stores"]),
+                str(overview["n_families"])
+            ]
+        })
+        st.dataframe(summary_stats, use_container_width=True, hide_index=True)
+    
+    with col2:
+        st.subheader("📊 Top Product Categories")
+        # Get top families by sales
+        top_families = overview["top_families"]
+        families_df = pd.DataFrame({
+            "Product Family": top_families.index,
+            "Total Sales": [f"${x:,.0f}" for x in top_families.values]
+        })
+        st.dataframe(families_df, use_container_width=True, hide_index=True)
+
+# ===============================
+# FORECASTING PAGE
+# ===============================
+elif page == "🔮 Forecasting":
+    st.markdown('<h1 class="main-header">🔮 Revenue Forecasting & Scenario Analysis</h1>', 
+                unsafe_allow_html=True)
+    
+    st.markdown("---")
+    
+    forecasting_page(forecast_days)
+
 # ===============================
 # MODEL ANALYSIS PAGE
 # ===============================
 elif page == "📊 Model Analysis":
+    from src.visualization import plot_residuals, plot_feature_importance
+    
     st.markdown('<h1 class="main-header">📊 Model Performance & Analysis</h1>', 
                 unsafe_allow_html=True)
     
     st.markdown("---")
     
     # Model Predictions
-    xgb_pred = xgb_model.predict(X_test)
+    xgb_pred = xgb_pred_full
     
     # Evaluation Metrics
-    xgb_metrics = evaluate_model(y_test, xgb_pred)
-    baseline_metrics = evaluate_model(y_test[:len(baseline_pred)], baseline_pred)
+    xgb_metrics = cached_metrics(y_test_np, xgb_pred)
+    baseline_metrics = cached_metrics(y_test_np[:len(baseline_pred)], baseline_pred)
     
     st.subheader("📈 Model Comparison")
     
@@ -478,7 +626,7 @@ elif page == "📊 Model Analysis":
     
     # Feature Importance
     st.subheader("🔍 Feature Importance Analysis")
-    importance_df = get_feature_importance(xgb_model, feature_cols)
+    importance_df = cached_importance(xgb_model, id(xgb_model), tuple(feature_cols))
     fig_importance = plot_feature_importance(importance_df, top_n=15)
     st.plotly_chart(fig_importance, use_container_width=True)
     
@@ -597,7 +745,7 @@ elif page == "📈 Statistical Analysis":
     st.subheader("📊 Forecast Confidence Intervals")
     
     # Get predictions for confidence intervals
-    xgb_pred = xgb_model.predict(X_test)
+    xgb_pred = xgb_pred_full
     errors = y_test[:len(xgb_pred)].values - xgb_pred[:len(y_test)]
     
     # Use a subset of predictions for demonstration
@@ -610,29 +758,31 @@ elif page == "📈 Statistical Analysis":
     )
     
     st.write("**95% Confidence Intervals for Forecast:**")
-    st.dataframe(forecast_with_ci.style.format({
-        'forecast': '${:,.0f}',
-        'lower_bound': '${:,.0f}',
-        'upper_bound': '${:,.0f}'
-    }), use_container_width=True, hide_index=True)
+    currency = '${:,.0f}'.format
+    forecast_with_ci_display = forecast_with_ci.assign(
+        forecast=forecast_with_ci['forecast'].map(currency),
+        lower_bound=forecast_with_ci['lower_bound'].map(currency),
+        upper_bound=forecast_with_ci['upper_bound'].map(currency)
+    )
+    st.dataframe(forecast_with_ci_display, use_container_width=True, hide_index=True)
     
     # Visualize confidence intervals
     import plotly.graph_objects as go
     fig_ci = go.Figure()
     
     dates = test.index[:forecast_days]
-    fig_ci.add_trace(go.Scatter(
+    fig_ci.add_trace(go.Scattergl(
         x=dates, y=forecast_with_ci['upper_bound'],
         mode='lines', name='Upper Bound',
         line=dict(width=0), showlegend=False
     ))
-    fig_ci.add_trace(go.Scatter(
+    fig_ci.add_trace(go.Scattergl(
         x=dates, y=forecast_with_ci['lower_bound'],
         mode='lines', name='Lower Bound',
         fill='tonexty', fillcolor='rgba(255,0,0,0.2)',
         line=dict(width=0), showlegend=False
     ))
-    fig_ci.add_trace(go.Scatter(
+    fig_ci.add_trace(go.Scattergl(
         x=dates, y=forecast_with_ci['forecast'],
         mode='lines+markers', name='Forecast',
         line=dict(color='blue', width=2)
@@ -680,12 +830,14 @@ elif page == "💾 Database":
     
     tab1, tab2, tab3, tab4 = st.tabs(["📊 Saved Forecasts", "🎯 Scenarios", "📈 Model Performance", "🔍 Custom Query"])
     
+    tables = get_database_tabs(db)
+    
     with tab1:
         st.subheader("Saved Forecasts")
         
         # Get scenarios safely
         try:
-            scenarios_df = db.get_scenarios()
+            scenarios_df = tables['scenarios']
             scenario_list = ["All"]
             if len(scenarios_df) > 0 and 'scenario_name' in scenarios_df.columns:
                 scenario_list.extend([s for s in scenarios_df['scenario_name'].unique() if s])
@@ -694,10 +846,9 @@ elif page == "💾 Database":
         
         scenario_filter = st.selectbox("Filter by Scenario", scenario_list)
         
-        if scenario_filter == "All":
-            forecasts_df = db.get_forecasts()
-        else:
-            forecasts_df = db.get_forecasts(scenario_name=scenario_filter)
+        forecasts_df = tables['forecasts']
+        if scenario_filter != "All":
+            forecasts_df = forecasts_df[forecasts_df['scenario_name'] == scenario_filter]
         
         if len(forecasts_df) > 0:
             st.dataframe(forecasts_df, use_container_width=True, hide_index=True)
@@ -716,7 +867,7 @@ elif page == "💾 Database":
     with tab2:
         st.subheader("Saved Scenarios")
         
-        scenarios_df = db.get_scenarios()
+        scenarios_df = tables['scenarios']
         
         if len(scenarios_df) > 0:
             st.dataframe(scenarios_df, use_container_width=True, hide_index=True)
@@ -726,7 +877,7 @@ elif page == "💾 Database":
     with tab3:
         st.subheader("Model Performance History")
         
-        perf_df = db.get_model_performance_history()
+        perf_df = tables['perf']
         
         if len(perf_df) > 0:
             st.dataframe(perf_df, use_container_width=True, hide_index=True)
@@ -778,9 +929,7 @@ elif page == "💼 Business Insights":
     col1, col2, col3, col4 = st.columns(4)
     
     # Calculate YoY growth
-    df_with_yoy = df.copy()
-    df_with_yoy["year"] = df_with_yoy.index.year
-    yearly_sales = df_with_yoy.groupby("year")["sales"].sum()
+    yearly_sales = df["sales"].groupby(df.index.year).sum()
     
     if len(yearly_sales) > 1:
         yoy_growth = ((yearly_sales.iloc[-1] - yearly_sales.iloc[-2]) / yearly_sales.iloc[-2] * 100)
@@ -801,12 +950,12 @@ elif page == "💼 Business Insights":
     # Seasonal Insights
     st.subheader("📅 Seasonal Pattern Insights")
     
-    df_insights = df.copy()
-    df_insights["month_name"] = df_insights.index.strftime("%B")
-    df_insights["day_name"] = df_insights.index.strftime("%A")
-    
-    monthly_avg = df_insights.groupby("month_name")["sales"].mean().sort_values(ascending=False)
-    weekly_avg = df_insights.groupby("day_name")["sales"].mean()
+    # Group on integer calendar codes, then name only the 12 + 7 results
+    monthly_avg = df["sales"].groupby(df.index.month).mean()
+    monthly_avg.index = [calendar.month_name[m] for m in monthly_avg.index]
+    monthly_avg = monthly_avg.sort_values(ascending=False)
+    weekly_avg = df["sales"].groupby(df.index.dayofweek).mean()
+    weekly_avg.index = [calendar.day_name[d] for d in weekly_avg.index]
     
     col1, col2 = st.columns(2)
     
@@ -830,17 +979,25 @@ elif page == "💼 Business Insights":
     st.markdown("---")
     st.subheader("💡 Business Recommendations")
     
+    sales_np = df["sales"].to_numpy()
+    
     # Analyze promotion impact
-    promo_impact = df.groupby(df["promo_count"] > 0)["sales"].mean()
-    if len(promo_impact) == 2:
-        promo_boost = ((promo_impact[True] - promo_impact[False]) / promo_impact[False] * 100)
-        st.info(f"📈 **Promotion Impact**: Days with promotions show {promo_boost:.1f}% higher average sales compared to non-promotion days.")
+    promo_mask = df["promo_count"].to_numpy() > 0
+    if promo_mask.any() and not promo_mask.all():
+        promo_mean = sales_np[promo_mask].mean()
+        nopromo_mean = sales_np[~promo_mask].mean()
+        if nopromo_mean:
+            promo_boost = (promo_mean - nopromo_mean) / nopromo_mean * 100
+            st.info(f"📈 **Promotion Impact**: Days with promotions show {promo_boost:.1f}% higher average sales compared to non-promotion days.")
     
     # Holiday impact
-    holiday_impact = df.groupby("is_holiday")["sales"].mean()
-    if len(holiday_impact) == 2:
-        holiday_boost = ((holiday_impact[1] - holiday_impact[0]) / holiday_impact[0] * 100)
-        st.info(f"🎉 **Holiday Impact**: Sales during holidays are {holiday_boost:.1f}% higher than regular days.")
+    holiday_mask = df["is_holiday"].to_numpy().astype(bool)
+    if holiday_mask.any() and not holiday_mask.all():
+        holiday_mean = sales_np[holiday_mask].mean()
+        regular_mean = sales_np[~holiday_mask].mean()
+        if regular_mean:
+            holiday_boost = (holiday_mean - regular_mean) / regular_mean * 100
+            st.info(f"🎉 **Holiday Impact**: Sales during holidays are {holiday_boost:.1f}% higher than regular days.")
     
     # Oil price correlation
     if "oil_price" in df.columns and df["oil_price"].notna().any():
@@ -1,53 +1,54 @@
 """
 Revenue Forecasting - Source Modules
+
+Submodules are imported on first attribute access, so importing one of
+them (e.g. ``src.data_processing``) doesn't pull in plotly or the export
+libraries.
 """
 
-from .data_processing import load_data, engineer_features, get_feature_columns, split_train_test
-from .modeling import train_xgboost, evaluate_model, get_feature_importance
-from .visualization import (
-    plot_forecast_comparison, 
-    plot_residuals, 
-    plot_feature_importance,
-    plot_seasonality_analysis
-)
-from .export_functions import (
-    create_excel_forecast_report,
-    create_csv_export,
-    get_download_link
-)
-from .statistical_analysis import (
-    calculate_confidence_interval,
-    test_promotion_impact,
-    test_holiday_impact,
-    calculate_correlations,
-    test_stationarity,
-    forecast_confidence_intervals,
-    calculate_forecast_accuracy_metrics
-)
-from .database import ForecastDatabase
-
-__all__ = [
-    'load_data',
-    'engineer_features',
-    'get_feature_columns',
-    'split_train_test',
-    'train_xgboost',
-    'evaluate_model',
-    'get_feature_importance',
-    'plot_forecast_comparison',
-    'plot_residuals',
-    'plot_feature_importance',
-    'plot_seasonality_analysis',
-    'create_excel_forecast_report',
-    'create_csv_export',
-    'get_download_link',
-    'calculate_confidence_interval',
-    'test_promotion_impact',
-    'test_holiday_impact',
-    'calculate_correlations',
-    'test_stationarity',
-    'forecast_confidence_intervals',
-    'calculate_forecast_accuracy_metrics',
-    'ForecastDatabase'
-]
+from importlib import import_module
+
+_EXPORTS = {
+    'FEATURE_COLUMNS': 'data_processing',
+    'load_data': 'data_processing',
+    'load_processed_data': 'data_processing',
+    'engineer_features': 'data_processing',
+    'get_feature_columns': 'data_processing',
+    'split_train_test': 'data_processing',
+    'downcast_features': 'data_processing',
+    'top_families_by_sales': 'data_processing',
+    'train_xgboost': 'modeling',
+    'evaluate_model': 'modeling',
+    'get_feature_importance': 'modeling',
+    'apply_scenario': 'modeling',
+    'plot_forecast_comparison': 'visualization',
+    'plot_residuals': 'visualization',
+    'plot_feature_importance': 'visualization',
+    'plot_seasonality_analysis': 'visualization',
+    'create_excel_forecast_report': 'export_functions',
+    'create_csv_export': 'export_functions',
+    'get_download_link': 'export_functions',
+    'calculate_confidence_interval': 'statistical_analysis',
+    'test_promotion_impact': 'statistical_analysis',
+    'test_holiday_impact': 'statistical_analysis',
+    'calculate_correlations': 'statistical_analysis',
+    'test_stationarity': 'statistical_analysis',
+    'test_stationarity_batch': 'statistical_analysis',
+    'forecast_confidence_intervals': 'statistical_analysis',
+    'calculate_forecast_accuracy_metrics': 'statistical_analysis',
+    'ForecastDatabase': 'database'
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(f".{_EXPORTS[name]}", __name__), name)
+    globals()[name] = value
+    return value
+
 
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -3,8 +3,108 @@ Data Processing Module
 Handles data loading, cleaning, and feature engineering for revenue forecasting.
 """
 
+import hashlib
+import glob
+import os
+
 import pandas as pd
 import numpy as np
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+try:
+    import polars as pl
+except ImportError:
+    pl = None
+
+
+DATA_FILES = ("train.csv", "oil.csv", "holidays_events.csv")
+
+# Bump when engineer_features output changes so cached Parquet is rebuilt
+FEATURES_VERSION = 3
+
+FEATURE_COLUMNS = (
+    "oil_price", "promo_count", "is_holiday", "is_weekend",
+    "year", "month", "day_of_week", "quarter",
+    "lag_1", "lag_7", "lag_30",
+    "roll_mean_7", "roll_mean_30",
+    "roll_std_7", "roll_std_30"
+)
+
+
+def _categorize_sales(sales_raw):
+    """Store the low-cardinality key columns as categoricals."""
+    return sales_raw.astype({"family": "category", "store_nbr": "category"})
+
+
+if njit is not None:
+    @njit(cache=True)
+    def _rolling_mean_std_numba(values, window):
+        # Welford running mean/variance: add the entering value and remove
+        # the leaving one, so each step is O(1) regardless of window size
+        n = len(values)
+        mean_out = np.full(n, np.nan)
+        std_out = np.full(n, np.nan)
+        nobs = 0
+        mean = 0.0
+        m2 = 0.0
+        for i in range(n):
+            x = values[i]
+            if not np.isnan(x):
+                nobs += 1
+                delta = x - mean
+                mean += delta / nobs
+                m2 += delta * (x - mean)
+            if i >= window:
+                y = values[i - window]
+                if not np.isnan(y):
+                    nobs -= 1
+                    if nobs == 0:
+                        mean = 0.0
+                        m2 = 0.0
+                    else:
+                        delta = y - mean
+                        mean -= delta / nobs
+                        m2 -= delta * (y - mean)
+            # Same as pandas' default min_periods=window
+            if nobs == window:
+                mean_out[i] = mean
+                if window > 1:
+                    std_out[i] = np.sqrt(max(m2, 0.0) / (window - 1))
+        return mean_out, std_out
+else:
+    _rolling_mean_std_numba = None
+
+
+def _backfill_leading(values):
+    """
+    Fill the leading NaNs left by shift/rolling with the first valid value
+    (all-NaN becomes zeros), matching bfill().ffill().fillna(0) for them.
+    """
+    values = np.array(values, dtype=np.float64)
+    valid = ~np.isnan(values)
+    if not valid.any():
+        return np.zeros_like(values)
+    first = valid.argmax()
+    values[:first] = values[first]
+    return values
+
+
+def _rolling_mean_std(series, window):
+    """Rolling mean and sample std of a series, JIT-compiled when numba is installed."""
+    if _rolling_mean_std_numba is None:
+        roll = series.rolling(window)
+        return roll.mean(), roll.std()
+    return _rolling_mean_std_numba(series.to_numpy(dtype=np.float64), window)
+
+
+def _read_csv(path, usecols):
+    """Read only the needed columns, with pyarrow's multithreaded parser when installed."""
+    try:
+        return pd.read_csv(path, engine="pyarrow", usecols=usecols, parse_dates=["date"])
+    except ImportError:
+        return pd.read_csv(path, usecols=usecols, parse_dates=["date"])
 
 
 def load_data(data_path="../data/"):
@@ -20,14 +120,16 @@ def load_data(data_path="../data/"):
     --------
     tuple : (sales_df, oil_df, holidays_df)
     """
-    sales = pd.read_csv(f"{data_path}/train.csv", parse_dates=["date"])
-    oil = pd.read_csv(f"{data_path}/oil.csv", parse_dates=["date"])
-    holidays = pd.read_csv(f"{data_path}/holidays_events.csv", parse_dates=["date"])
+    sales = _categorize_sales(_read_csv(
+        f"{data_path}/train.csv", ["date", "store_nbr", "family", "sales", "onpromotion"]
+    ))
+    oil = _read_csv(f"{data_path}/oil.csv", ["date", "dcoilwtico"])
+    holidays = _read_csv(f"{data_path}/holidays_events.csv", ["date"])
     
     return sales, oil, holidays
 
 
-def engineer_features(sales_raw, oil, holidays):
+def engineer_features(sales_raw, oil, holidays, backend="pandas"):
     """
     Perform feature engineering for time series forecasting.
     
@@ -39,68 +141,306 @@ def engineer_features(sales_raw, oil, holidays):
         Oil price data
     holidays : pd.DataFrame
         Holiday calendar
+    backend : str
+        "pandas" (default) or "polars" to use engineer_features_polars
         
     Returns:
     --------
     pd.DataFrame : Processed dataframe with features
     """
-    # Aggregate daily sales
-    daily_sales = sales_raw.groupby("date")["sales"].sum().reset_index()
-    promo = sales_raw.groupby("date")["onpromotion"].sum().reset_index()
-    promo.rename(columns={"onpromotion": "promo_count"}, inplace=True)
+    if backend == "polars":
+        return engineer_features_polars(sales_raw, oil, holidays)
+    if backend != "pandas":
+        raise ValueError(f"Unknown backend: {backend!r}")
     
-    # Merge datasets
-    df = daily_sales.merge(promo, on="date", how="left")
-    df["promo_count"] = df["promo_count"].fillna(0)
+    # Aggregate daily sales and promotions in one grouping pass
+    df = sales_raw.groupby("date", sort=True, as_index=False).agg(
+        sales=("sales", "sum"),
+        promo_count=("onpromotion", "sum")
+    )
     
-    df = df.merge(oil, on="date", how="left")
-    df["oil_price"] = df["dcoilwtico"].ffill().bfill()
+    # Carry the latest known oil price forward with a sorted as-of join;
+    # only days before the first quote need a backfill
+    oil_prices = (
+        oil.dropna(subset=["dcoilwtico"])
+        .rename(columns={"dcoilwtico": "oil_price"})
+        .sort_values("date")
+    )
+    df = pd.merge_asof(df, oil_prices[["date", "oil_price"]], on="date", direction="backward")
+    df["oil_price"] = _backfill_leading(df["oil_price"])
     
     # Sort by date and set as index
     df = df.sort_values("date").set_index("date")
     
+    idx = df.index
+    sales = df["sales"]
+    
     # Time-based features
-    df["year"] = df.index.year
-    df["month"] = df.index.month
-    df["day_of_week"] = df.index.dayofweek
-    df["day_of_month"] = df.index.day
-    df["is_weekend"] = (df.index.dayofweek >= 5).astype(int)
-    df["quarter"] = df.index.quarter
+    dow = idx.dayofweek
     
     # Lag features
-    df["lag_1"] = df["sales"].shift(1)
-    df["lag_7"] = df["sales"].shift(7)
-    df["lag_30"] = df["sales"].shift(30)
+    sales_lag_1 = sales.shift(1)
     
-    # Rolling statistics
-    df["roll_mean_7"] = df["sales"].shift(1).rolling(7).mean()
-    df["roll_mean_30"] = df["sales"].shift(1).rolling(30).mean()
-    df["roll_std_7"] = df["sales"].shift(1).rolling(7).std()
-    df["roll_std_30"] = df["sales"].shift(1).rolling(30).std()
+    # Rolling statistics (over the already-shifted series)
+    roll_mean_7, roll_std_7 = _rolling_mean_std(sales_lag_1, 7)
+    roll_mean_30, roll_std_30 = _rolling_mean_std(sales_lag_1, 30)
     
     # Holiday features
-    holiday_dates = holidays["date"].dropna().unique()
-    df["is_holiday"] = df.index.isin(holiday_dates).astype(int)
+    # Both sides are dates, so a binary search into the sorted holiday
+    # array replaces isin's hash table
+    holiday_dates = np.unique(pd.to_datetime(holidays["date"].dropna()).to_numpy(dtype="datetime64[ns]"))
+    dates = idx.to_numpy(dtype="datetime64[ns]")
+    pos = np.searchsorted(holiday_dates, dates)
+    found = pos < len(holiday_dates)
+    is_holiday = np.zeros(len(dates), dtype=int)
+    is_holiday[found] = holiday_dates[pos[found]] == dates[found]
     
     # Year-over-year growth
-    df["yoy_sales"] = df["sales"].shift(365)
-    df["yoy_growth"] = (df["sales"] - df["yoy_sales"]) / (df["yoy_sales"] + 1)
+    yoy_sales = sales.shift(365)
+    
+    # Collect every derived column and attach them in one concat instead
+    # of inserting them into df one at a time. Only the shifted/rolled
+    # columns can hold NaNs, and only at the start, so they are backfilled
+    # here rather than sweeping the whole frame afterwards.
+    feats = {
+        "year": idx.year,
+        "month": idx.month,
+        "day_of_week": dow,
+        "day_of_month": idx.day,
+        "is_weekend": (dow >= 5).astype(int),
+        "quarter": idx.quarter,
+        "lag_1": _backfill_leading(sales_lag_1),
+        "lag_7": _backfill_leading(sales.shift(7)),
+        "lag_30": _backfill_leading(sales.shift(30)),
+        "roll_mean_7": _backfill_leading(roll_mean_7),
+        "roll_mean_30": _backfill_leading(roll_mean_30),
+        "roll_std_7": _backfill_leading(roll_std_7),
+        "roll_std_30": _backfill_leading(roll_std_30),
+        "is_holiday": is_holiday,
+        "yoy_sales": _backfill_leading(yoy_sales),
+        "yoy_growth": _backfill_leading((sales - yoy_sales) / (yoy_sales + 1)),
+    }
+    df = pd.concat([df, pd.DataFrame(feats, index=idx)], axis=1)
     
-    # Fill missing values (using forward fill then backward fill, then zero)
-    df = df.bfill().ffill().fillna(0)
+    # Calendar flags/codes fit in int8 (year in int16); float features in
+    # float32, the precision XGBoost trains at. The sales target stays float64.
+    df = df.astype({
+        **dict.fromkeys(["is_holiday", "is_weekend", "day_of_week", "month",
+                         "quarter", "day_of_month"], np.int8),
+        "year": np.int16,
+        **dict.fromkeys(["oil_price", "lag_1", "lag_7", "lag_30",
+                         "roll_mean_7", "roll_mean_30", "roll_std_7", "roll_std_30",
+                         "yoy_sales", "yoy_growth"], np.float32),
+    })
     
     return df
 
 
+def engineer_features_polars(sales_raw, oil, holidays):
+    """
+    Polars implementation of engineer_features.
+    
+    Builds the whole pipeline as one lazy query so Polars can run the
+    aggregation, as-of join and window expressions multithreaded, and
+    returns the same columns and dtypes as the pandas version.
+    
+    Parameters:
+    -----------
+    sales_raw : pd.DataFrame
+        Raw sales data
+    oil : pd.DataFrame
+        Oil price data
+    holidays : pd.DataFrame
+        Holiday calendar
+        
+    Returns:
+    --------
+    pd.DataFrame : Processed dataframe with features
+    """
+    if pl is None:
+        raise ImportError("polars is required for backend='polars'")
+    
+    date_type = pl.Datetime("us")
+    sales_lf = pl.from_pandas(sales_raw[["date", "sales", "onpromotion"]]).lazy()
+    oil_lf = (
+        pl.from_pandas(oil[["date", "dcoilwtico"]]).lazy()
+        .drop_nulls("dcoilwtico")
+        .filter(pl.col("dcoilwtico").is_not_nan())
+        .select(pl.col("date").cast(date_type), pl.col("dcoilwtico").alias("oil_price"))
+        .sort("date")
+    )
+    holiday_dates = pl.from_pandas(holidays["date"].dropna()).cast(date_type).unique()
+    
+    sales = pl.col("sales")
+    lag_1 = sales.shift(1)
+    dow = pl.col("date").dt.weekday() - 1  # Polars counts Monday as 1
+    yoy_sales = sales.shift(365)
+    
+    lf = (
+        sales_lf
+        .group_by("date")
+        .agg(sales.sum(), pl.col("onpromotion").sum().alias("promo_count"))
+        .with_columns(pl.col("date").cast(date_type))
+        .sort("date")
+        .join_asof(oil_lf, on="date", strategy="backward")
+        .with_columns(pl.col("oil_price").fill_null(strategy="backward"))
+        .with_columns(
+            pl.col("date").dt.year().alias("year"),
+            pl.col("date").dt.month().alias("month"),
+            dow.alias("day_of_week"),
+            pl.col("date").dt.day().alias("day_of_month"),
+            (dow >= 5).alias("is_weekend"),
+            pl.col("date").dt.quarter().alias("quarter"),
+            lag_1.alias("lag_1"),
+            sales.shift(7).alias("lag_7"),
+            sales.shift(30).alias("lag_30"),
+            lag_1.rolling_mean(7).alias("roll_mean_7"),
+            lag_1.rolling_mean(30).alias("roll_mean_30"),
+            lag_1.rolling_std(7).alias("roll_std_7"),
+            lag_1.rolling_std(30).alias("roll_std_30"),
+            pl.col("date").is_in(holiday_dates.implode()).alias("is_holiday"),
+            yoy_sales.alias("yoy_sales"),
+            ((sales - yoy_sales) / (yoy_sales + 1)).alias("yoy_growth"),
+        )
+        # Same fill order as the pandas path: backward, forward, then zero
+        .with_columns(
+            pl.all().exclude("date")
+            .fill_null(strategy="backward")
+            .fill_null(strategy="forward")
+            .fill_null(0)
+        )
+        .with_columns(
+            pl.col("is_holiday", "is_weekend", "day_of_week", "month",
+                   "quarter", "day_of_month").cast(pl.Int8),
+            pl.col("year").cast(pl.Int16),
+            pl.col("oil_price", "lag_1", "lag_7", "lag_30",
+                   "roll_mean_7", "roll_mean_30", "roll_std_7", "roll_std_30",
+                   "yoy_sales", "yoy_growth").cast(pl.Float32),
+            pl.col("promo_count").cast(pl.Int64),
+        )
+    )
+    
+    return lf.collect().to_pandas().set_index("date")
+
+
+def _data_cache_key(data_path):
+    """Hash the name, size and modification time of each source file."""
+    digest = hashlib.md5(f"v{FEATURES_VERSION};".encode())
+    for name in DATA_FILES:
+        stat = os.stat(os.path.join(data_path, name))
+        digest.update(f"{name}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+    return digest.hexdigest()[:16]
+
+
+def _write_parquet_atomic(df, path):
+    """Write df to path via a temporary file so readers never see a partial file."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        df.to_parquet(tmp_path, engine="pyarrow", compression="zstd")
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def load_processed_data(data_path="../data/", cache_dir=None):
+    """
+    Load datasets and engineer features, reusing an on-disk Parquet cache.
+    
+    The cache is keyed on the source files' sizes and modification times,
+    so editing any CSV invalidates it.
+    
+    Parameters:
+    -----------
+    data_path : str
+        Path to data directory
+    cache_dir : str, optional
+        Directory for cached Parquet files (defaults to ``<data_path>/cache``)
+        
+    Returns:
+    --------
+    tuple : (features_df, sales_df)
+    """
+    if cache_dir is None:
+        cache_dir = os.path.join(data_path, "cache")
+    key = _data_cache_key(data_path)
+    features_path = os.path.join(cache_dir, f"features_{key}.parquet")
+    sales_path = os.path.join(cache_dir, f"sales_{key}.parquet")
+    
+    if os.path.exists(features_path) and os.path.exists(sales_path):
+        # An unreadable cache (e.g. truncated by a crash) is recomputed
+        # and overwritten below rather than failing every cold start
+        try:
+            df = pd.read_parquet(features_path, engine="pyarrow")
+            sales_raw = _categorize_sales(pd.read_parquet(sales_path, engine="pyarrow"))
+            return df, sales_raw
+        except (OSError, ValueError, ImportError):
+            pass
+    
+    sales_raw, oil, holidays = load_data(data_path)
+    df = engineer_features(sales_raw, oil, holidays)
+    
+    # Caching is best effort: a read-only data directory or missing
+    # pyarrow just means the next cold start recomputes
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        # Only remove files this cache wrote; cache_dir may be shared
+        for prefix in ("features_", "sales_"):
+            for stale in glob.glob(os.path.join(cache_dir, f"{prefix}*.parquet")):
+                os.remove(stale)
+        _write_parquet_atomic(df, features_path)
+        _write_parquet_atomic(sales_raw, sales_path)
+    except (OSError, ImportError):
+        pass
+    
+    return df, sales_raw
+
+
+def top_families_by_sales(sales_raw, n=10):
+    """
+    Return the product families with the highest total sales.
+    
+    Parameters:
+    -----------
+    sales_raw : pd.DataFrame
+        Raw sales data with 'family' and 'sales' columns
+    n : int
+        Number of families to return
+        
+    Returns:
+    --------
+    pd.Series : Total sales per family, largest first
+    """
+    totals = sales_raw.groupby("family", observed=True, sort=False)["sales"].sum()
+    return totals.nlargest(n)
+
+
 def get_feature_columns():
     """Return list of feature column names."""
-    return [
-        "oil_price", "promo_count", "is_holiday", "is_weekend",
-        "year", "month", "day_of_week", "quarter",
-        "lag_1", "lag_7", "lag_30",
-        "roll_mean_7", "roll_mean_30",
-        "roll_std_7", "roll_std_30"
-    ]
+    return list(FEATURE_COLUMNS)
+
+
+def downcast_features(X):
+    """
+    Downcast feature columns to compact dtypes for model training and inference.
+    
+    Floats become float32 (XGBoost's internal precision) and integers are
+    shrunk to the smallest type that holds their range.
+    
+    Parameters:
+    -----------
+    X : pd.DataFrame
+        Feature matrix
+        
+    Returns:
+    --------
+    pd.DataFrame : Downcast copy of the feature matrix
+    """
+    float_cols = X.select_dtypes(include="float64").columns
+    int_cols = X.select_dtypes(include="integer").columns
+    X = X.astype({col: "float32" for col in float_cols})
+    return X.assign(**{col: pd.to_numeric(X[col], downcast="integer") for col in int_cols})
 
 
 def split_train_test(df, split_date="2017-01-01"):
@@ -8,6 +8,29 @@ import pandas as pd
 import numpy as np
 from datetime import datetime
 import os
+import threading
+from itertools import repeat
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+
+def _is_select(query):
+    """True if query is a SELECT/WITH statement (leading comments skipped)."""
+    text = query.lstrip()
+    while text.startswith(("--", "/*")):
+        end = text.find("\n") if text.startswith("--") else text.find("*/")
+        if end < 0:
+            return False
+        text = text[end + (1 if text.startswith("--") else 2):].lstrip()
+    keyword = text.split(None, 1)[0].upper() if text else ""
+    return keyword in ("SELECT", "WITH")
+
+
+def _sql_values(series):
+    """Column as a list of Python scalars for sqlite3, with NaN/NaT as None."""
+    return series.astype(object).where(series.notna(), None).tolist()
 
 
 class ForecastDatabase:
@@ -25,77 +48,109 @@ class ForecastDatabase:
             Path to SQLite database file
         """
         self.db_path = db_path
+        self._duckdb_available = duckdb is not None
+        self._tls = threading.local()
+        self._connections = {}
+        self._write_lock = threading.Lock()
+        self._duckdb_con = None
+        self._duckdb_lock = threading.Lock()
         self._initialize_database()
     
     def _get_connection(self):
         """
-        Get a database connection. Creates a new connection each time
-        to avoid thread-safety issues with Streamlit.
+        Get this thread's database connection, opening it on first use.
+        Streamlit serves sessions from worker threads, so each thread keeps
+        its own connection; writes are serialized with _write_lock.
         """
+        conn = getattr(self._tls, "conn", None)
+        if conn is not None:
+            return conn
+        
         conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        # Serve reads from memory-mapped pages and a 64 MB page cache
+        conn.execute("PRAGMA mmap_size=268435456")
+        conn.execute("PRAGMA cache_size=-65536")
+        # Safe under WAL; skips the fsync on every commit
+        conn.execute("PRAGMA synchronous=NORMAL")
+        self._tls.conn = conn
+        with self._write_lock:
+            # Streamlit starts a fresh thread per rerun, so close the
+            # connections of threads that have finished before adding ours
+            for thread in [t for t in self._connections if not t.is_alive()]:
+                self._connections.pop(thread).close()
+            self._connections[threading.current_thread()] = conn
         return conn
     
     def _initialize_database(self):
         """Create database tables if they don't exist."""
         conn = self._get_connection()
         cursor = conn.cursor()
+        with self._write_lock:
+            # WAL lets dashboard reads proceed while a scenario is being saved
+            cursor.execute("PRAGMA journal_mode=WAL")
         
-        # Table 1: Forecasts
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS forecasts (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                date TEXT NOT NULL,
-                forecast_value REAL NOT NULL,
-                actual_value REAL,
-                model_type TEXT,
-                scenario_name TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(date, model_type, scenario_name)
-            )
-        """)
+            # Table 1: Forecasts
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS forecasts (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    date TEXT NOT NULL,
+                    forecast_value REAL NOT NULL,
+                    actual_value REAL,
+                    model_type TEXT,
+                    scenario_name TEXT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    UNIQUE(date, model_type, scenario_name)
+                )
+            """)
         
-        # Table 2: Scenarios
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS scenarios (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                scenario_name TEXT UNIQUE NOT NULL,
-                promo_change REAL,
-                oil_change REAL,
-                forecast_days INTEGER,
-                revenue_impact REAL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
+            # Filtered reads go by scenario/model, which the UNIQUE(date, ...)
+            # index can't serve
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_forecasts_lookup
+                ON forecasts(scenario_name, model_type, date)
+            """)
         
-        # Table 3: Model Performance
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS model_performance (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                model_type TEXT NOT NULL,
-                mape REAL,
-                rmse REAL,
-                mae REAL,
-                r2_score REAL,
-                test_date TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
+            # Table 2: Scenarios
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS scenarios (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    scenario_name TEXT UNIQUE NOT NULL,
+                    promo_change REAL,
+                    oil_change REAL,
+                    forecast_days INTEGER,
+                    revenue_impact REAL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+        
+            # Table 3: Model Performance
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS model_performance (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    model_type TEXT NOT NULL,
+                    mape REAL,
+                    rmse REAL,
+                    mae REAL,
+                    r2_score REAL,
+                    test_date TEXT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
         
-        # Table 4: Historical Sales
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS historical_sales (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                date TEXT UNIQUE NOT NULL,
-                sales REAL NOT NULL,
-                promo_count INTEGER DEFAULT 0,
-                oil_price REAL,
-                is_holiday INTEGER DEFAULT 0,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
+            # Table 4: Historical Sales
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS historical_sales (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    date TEXT UNIQUE NOT NULL,
+                    sales REAL NOT NULL,
+                    promo_count INTEGER DEFAULT 0,
+                    oil_price REAL,
+                    is_holiday INTEGER DEFAULT 0,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
         
-        conn.commit()
-        conn.close()
+            conn.commit()
     
     def save_forecast(self, date, forecast_value, actual_value=None, model_type="XGBoost", scenario_name="baseline"):
         """
@@ -115,17 +170,14 @@ class ForecastDatabase:
             Name of scenario
         """
         conn = self._get_connection()
-        cursor = conn.cursor()
         date_str = date if isinstance(date, str) else date.strftime('%Y-%m-%d')
         
-        cursor.execute("""
-            INSERT OR REPLACE INTO forecasts 
-            (date, forecast_value, actual_value, model_type, scenario_name)
-            VALUES (?, ?, ?, ?, ?)
-        """, (date_str, forecast_value, actual_value, model_type, scenario_name))
-        
-        conn.commit()
-        conn.close()
+        with self._write_lock, conn:
+            conn.execute("""
+                INSERT OR REPLACE INTO forecasts 
+                (date, forecast_value, actual_value, model_type, scenario_name)
+                VALUES (?, ?, ?, ?, ?)
+            """, (date_str, forecast_value, actual_value, model_type, scenario_name))
     
     def save_bulk_forecasts(self, forecast_df, model_type="XGBoost", scenario_name="baseline"):
         """
@@ -140,23 +192,19 @@ class ForecastDatabase:
         scenario_name : str
             Name of scenario
         """
-        conn = self._get_connection()
-        cursor = conn.cursor()
+        dates = forecast_df['date'] if 'date' in forecast_df else forecast_df.index
+        dates = pd.DatetimeIndex(dates).strftime('%Y-%m-%d')
+        forecasts = forecast_df['forecast'] if 'forecast' in forecast_df else forecast_df.iloc[:, 0]
+        actuals = _sql_values(forecast_df['actual']) if 'actual' in forecast_df else repeat(None)
+        rows = zip(dates, forecasts.tolist(), actuals, repeat(model_type), repeat(scenario_name))
         
-        for _, row in forecast_df.iterrows():
-            date = row['date'] if 'date' in row else row.name
-            date_str = date if isinstance(date, str) else pd.to_datetime(date).strftime('%Y-%m-%d')
-            forecast_val = row['forecast'] if 'forecast' in row else row.iloc[0]
-            actual_val = row.get('actual', None)
-            
-            cursor.execute("""
+        conn = self._get_connection()
+        with self._write_lock, conn:
+            conn.executemany("""
                 INSERT OR REPLACE INTO forecasts 
                 (date, forecast_value, actual_value, model_type, scenario_name)
                 VALUES (?, ?, ?, ?, ?)
-            """, (date_str, forecast_val, actual_val, model_type, scenario_name))
-        
-        conn.commit()
-        conn.close()
+            """, rows)
     
     def save_scenario(self, scenario_name, promo_change, oil_change, forecast_days, revenue_impact):
         """
@@ -176,15 +224,12 @@ class ForecastDatabase:
             Calculated revenue impact
         """
         conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
-            INSERT OR REPLACE INTO scenarios 
-            (scenario_name, promo_change, oil_change, forecast_days, revenue_impact)
-            VALUES (?, ?, ?, ?, ?)
-        """, (scenario_name, promo_change, oil_change, forecast_days, revenue_impact))
-        
-        conn.commit()
-        conn.close()
+        with self._write_lock, conn:
+            conn.execute("""
+                INSERT OR REPLACE INTO scenarios 
+                (scenario_name, promo_change, oil_change, forecast_days, revenue_impact)
+                VALUES (?, ?, ?, ?, ?)
+            """, (scenario_name, promo_change, oil_change, forecast_days, revenue_impact))
     
     def save_model_performance(self, model_type, mape, rmse, mae, r2_score, test_date=None):
         """
@@ -206,15 +251,12 @@ class ForecastDatabase:
             Test date
         """
         conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
-            INSERT INTO model_performance 
-            (model_type, mape, rmse, mae, r2_score, test_date)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, (model_type, mape, rmse, mae, r2_score, test_date or datetime.now().strftime('%Y-%m-%d')))
-        
-        conn.commit()
-        conn.close()
+        with self._write_lock, conn:
+            conn.execute("""
+                INSERT INTO model_performance 
+                (model_type, mape, rmse, mae, r2_score, test_date)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, (model_type, mape, rmse, mae, r2_score, test_date or datetime.now().strftime('%Y-%m-%d')))
     
     def get_forecasts(self, scenario_name=None, model_type=None, start_date=None, end_date=None):
         """
@@ -256,17 +298,13 @@ class ForecastDatabase:
         
         query += " ORDER BY date"
         
-        conn = self._get_connection()
-        result = pd.read_sql_query(query, conn, params=params)
-        conn.close()
-        return result
+        return pd.read_sql_query(query, self._get_connection(), params=params,
+                                 parse_dates=["date", "created_at"])
     
     def get_scenarios(self):
         """Get all saved scenarios."""
-        conn = self._get_connection()
-        result = pd.read_sql_query("SELECT * FROM scenarios ORDER BY created_at DESC", conn)
-        conn.close()
-        return result
+        return pd.read_sql_query("SELECT * FROM scenarios ORDER BY created_at DESC",
+                                 self._get_connection())
     
     def get_model_performance_history(self, model_type=None):
         """Get model performance history."""
@@ -277,9 +315,22 @@ class ForecastDatabase:
             result = pd.read_sql_query(query, conn, params=[model_type])
         else:
             result = pd.read_sql_query(query, conn)
-        conn.close()
         return result
     
+    def get_all_tabs_bulk(self):
+        """
+        Fetch everything the dashboard's Database page displays in one go.
+        
+        Returns:
+        --------
+        dict : {'forecasts': pd.DataFrame, 'scenarios': pd.DataFrame, 'perf': pd.DataFrame}
+        """
+        return {
+            'forecasts': self.get_forecasts(),
+            'scenarios': self.get_scenarios(),
+            'perf': self.get_model_performance_history(),
+        }
+    
     def save_historical_sales(self, df):
         """
         Save historical sales data to database.
@@ -289,29 +340,71 @@ class ForecastDatabase:
         df : pd.DataFrame
             DataFrame with sales data
         """
-        conn = self._get_connection()
-        cursor = conn.cursor()
+        def column(name, default):
+            return _sql_values(df[name]) if name in df else repeat(default)
         
-        for date, row in df.iterrows():
-            date_str = date if isinstance(date, str) else pd.to_datetime(date).strftime('%Y-%m-%d')
-            sales = row['sales'] if 'sales' in row else row.iloc[0]
-            promo_count = row.get('promo_count', 0)
-            oil_price = row.get('oil_price', None)
-            is_holiday = row.get('is_holiday', 0)
-            
-            cursor.execute("""
+        dates = pd.DatetimeIndex(df.index).strftime('%Y-%m-%d')
+        sales = df['sales'] if 'sales' in df else df.iloc[:, 0]
+        rows = zip(dates, sales.tolist(), column('promo_count', 0),
+                   column('oil_price', None), column('is_holiday', 0))
+        
+        conn = self._get_connection()
+        with self._write_lock, conn:
+            conn.executemany("""
                 INSERT OR REPLACE INTO historical_sales 
                 (date, sales, promo_count, oil_price, is_holiday)
                 VALUES (?, ?, ?, ?, ?)
-            """, (date_str, sales, promo_count, oil_price, is_holiday))
+            """, rows)
+    
+    def _get_duckdb_connection(self):
+        """
+        Get the DuckDB connection with the SQLite file attached, opening it
+        on first use. Returns None if the sqlite extension is unavailable.
+        Callers must hold _duckdb_lock.
+        """
+        if self._duckdb_con is None:
+            con = duckdb.connect()
+            try:
+                db_path = self.db_path.replace("'", "''")
+                con.execute(f"ATTACH '{db_path}' AS forecast_db (TYPE sqlite, READ_ONLY)")
+                con.execute("USE forecast_db")
+            except duckdb.Error:
+                # Don't retry the extension load on every query
+                con.close()
+                self._duckdb_available = False
+                return None
+            self._duckdb_con = con
+        return self._duckdb_con
+    
+    def _duckdb_query(self, query, params=None):
+        """
+        Run a read-only query through DuckDB's SQLite scanner.
+        Returns None if DuckDB or its sqlite extension is unavailable, or if
+        DuckDB rejects the query, so the caller can fall back to SQLite.
+        """
+        if not self._duckdb_available:
+            return None
         
-        conn.commit()
-        conn.close()
+        # A DuckDB connection must not be used from two threads at once
+        with self._duckdb_lock:
+            con = self._get_duckdb_connection()
+            if con is None:
+                return None
+            try:
+                return con.execute(query, params).fetch_df()
+            except duckdb.Error:
+                # SQLite-only syntax or functions, e.g. date('now'), julianday()
+                return None
     
     def execute_query(self, query, params=None):
         """
         Execute a custom SQL query.
         
+        SELECT/WITH queries run on DuckDB's columnar engine when it is
+        installed (DuckDB's SQL dialect applies, e.g. ``/`` on integers
+        returns a float); everything else, and anything DuckDB rejects,
+        runs on SQLite. Custom queries never commit.
+        
         Parameters:
         -----------
         query : str
@@ -323,14 +416,30 @@ class ForecastDatabase:
         --------
         pd.DataFrame : Query results
         """
+        if _is_select(query):
+            result = self._duckdb_query(query, params)
+            if result is not None:
+                return result
+        
         conn = self._get_connection()
-        result = pd.read_sql_query(query, conn, params=params)
-        conn.close()
-        return result
+        try:
+            return pd.read_sql_query(query, conn, params=params)
+        finally:
+            # The per-thread connection is reused; an open transaction left
+            # by a non-SELECT statement would block the writers
+            conn.rollback()
     
     def close(self):
-        """Close database connection. No-op since connections are created per-operation."""
-        pass
+        """Close every connection opened by this instance."""
+        with self._duckdb_lock:
+            if self._duckdb_con is not None:
+                self._duckdb_con.close()
+                self._duckdb_con = None
+        with self._write_lock:
+            for conn in self._connections.values():
+                conn.close()
+            self._connections.clear()
+        self._tls = threading.local()
     
     def __enter__(self):
         """Context manager entry."""
@@ -8,6 +8,20 @@ import numpy as np
 from datetime import datetime
 from io import BytesIO
 import base64
+try:
+    import xlsxwriter
+except ImportError:
+    xlsxwriter = None
+
+
+# Metric formatters keyed by exact type (same rules as isinstance checks on
+# float / int / np.integer, but a single dict lookup per value)
+_FMT = {float: "{:.4f}".format, np.float64: "{:.4f}".format}
+_FMT.update(dict.fromkeys(
+    (int, bool, np.int8, np.int16, np.int32, np.int64,
+     np.uint8, np.uint16, np.uint32, np.uint64),
+    "{:,.0f}".format
+))
 
 
 def create_excel_forecast_report(forecast_df, actual_df, metrics_dict, scenario_params=None):
@@ -31,7 +45,12 @@ def create_excel_forecast_report(forecast_df, actual_df, metrics_dict, scenario_
     """
     output = BytesIO()
     
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
+    # xlsxwriter serializes much faster than openpyxl; constant_memory mode
+    # is not used because pandas writes cells column by column and that mode
+    # silently drops any cell above the current row
+    engine = 'xlsxwriter' if xlsxwriter is not None else 'openpyxl'
+    
+    with pd.ExcelWriter(output, engine=engine) as writer:
         # Sheet 1: Forecast Data
         forecast_export = forecast_df.copy()
         if 'date' in forecast_export.columns:
@@ -52,13 +71,18 @@ def create_excel_forecast_report(forecast_df, actual_df, metrics_dict, scenario_
         else:
             dates = pd.date_range(start='2020-01-01', periods=min_len, freq='D')
         
+        # Derive all three error columns from one difference array
+        error = actual_vals.astype(np.float64) - forecast_vals.astype(np.float64)
+        abs_error = np.abs(error)
+        pct_error = abs_error / np.abs(actual_vals + 1) * 100
+        
         comparison = pd.DataFrame({
             'Date': dates,
             'Actual': actual_vals,
             'Forecast': forecast_vals,
-            'Error': actual_vals - forecast_vals,
-            'Absolute Error': np.abs(actual_vals - forecast_vals),
-            'Percentage Error': np.abs((actual_vals - forecast_vals) / (actual_vals + 1)) * 100
+            'Error': error,
+            'Absolute Error': abs_error,
+            'Percentage Error': pct_error
         })
         comparison['Date'] = pd.to_datetime(comparison['Date']).dt.strftime('%Y-%m-%d')
         comparison.to_excel(writer, sheet_name='Forecast vs Actual', index=False)
@@ -66,8 +90,7 @@ def create_excel_forecast_report(forecast_df, actual_df, metrics_dict, scenario_
         # Sheet 3: Metrics Summary
         metrics_df = pd.DataFrame({
             'Metric': list(metrics_dict.keys()),
-            'Value': [f"{v:.4f}" if isinstance(v, float) else f"{v:,.0f}" if isinstance(v, (int, np.integer)) else str(v) 
-                     for v in metrics_dict.values()]
+            'Value': [_FMT.get(type(v), str)(v) for v in metrics_dict.values()]
         })
         metrics_df.to_excel(writer, sheet_name='Performance Metrics', index=False)
         
@@ -102,28 +125,44 @@ def create_csv_export(data_df, filename_prefix="forecast"):
     return csv_string
 
 
-def get_download_link(file_content, filename, file_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"):
+def get_download_link(file_content, filename, file_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                      use_button=True, label=None):
     """
-    Generate download link for Streamlit.
+    Offer a file for download in Streamlit, as a download button (raw bytes)
+    or a legacy base64 HTML link.
     
     Parameters:
     -----------
-    file_content : BytesIO or str
+    file_content : BytesIO, bytes or str
         File content
     filename : str
         Filename for download
     file_type : str
         MIME type
+    use_button : bool
+        Render a download button (True) or return an HTML link (False)
+    label : str, optional
+        Button label (defaults to "Download <filename>")
         
     Returns:
     --------
-    str : HTML download link
+    bool or str : Whether the button was clicked, or the HTML download link
     """
     if isinstance(file_content, BytesIO):
-        b64 = base64.b64encode(file_content.read()).decode()
-    else:
-        b64 = base64.b64encode(file_content.encode()).decode()
+        file_content = file_content.getvalue()
+    
+    if use_button:
+        import streamlit as st
+        return st.download_button(
+            label=label or f"Download {filename}",
+            data=file_content,
+            file_name=filename,
+            mime=file_type
+        )
+    
+    if isinstance(file_content, str):
+        file_content = file_content.encode()
+    b64 = base64.b64encode(file_content).decode()
     
     href = f'<a href="data:{file_type};base64,{b64}" download="{filename}">Download {filename}</a>'
     return href
-
@@ -7,17 +7,29 @@ import pandas as pd
 import numpy as np
 from xgboost import XGBRegressor
 from prophet import Prophet
-from sklearn.metrics import (
-    mean_absolute_percentage_error,
-    mean_absolute_error,
-    mean_squared_error,
-    r2_score
-)
 import warnings
 warnings.filterwarnings('ignore')
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+try:
+    import cupy
+except ImportError:
+    cupy = None
 
 
-def train_xgboost(X_train, y_train, **kwargs):
+def _xgboost_device():
+    """Return "cuda" when a CUDA GPU is visible, otherwise "cpu"."""
+    if cupy is None:
+        return "cpu"
+    try:
+        return "cuda" if cupy.cuda.runtime.getDeviceCount() > 0 else "cpu"
+    except Exception:
+        return "cpu"
+
+
+def train_xgboost(X_train, y_train, eval_set=None, early_stopping_rounds=None, **kwargs):
     """
     Train XGBoost model.
     
@@ -27,6 +39,11 @@ def train_xgboost(X_train, y_train, **kwargs):
         Training features
     y_train : pd.Series
         Training target
+    eval_set : list of (X, y) tuples, optional
+        Validation data monitored during training
+    early_stopping_rounds : int, optional
+        Stop once the last eval_set entry has not improved for this many
+        rounds (requires eval_set)
     **kwargs : dict
         Additional XGBoost parameters
         
@@ -41,12 +58,16 @@ def train_xgboost(X_train, y_train, **kwargs):
         "subsample": 0.8,
         "colsample_bytree": 0.8,
         "random_state": 42,
-        "n_jobs": -1
+        "n_jobs": -1,
+        "tree_method": "hist",
+        "device": _xgboost_device()
     }
+    if eval_set is not None and early_stopping_rounds is not None:
+        default_params["early_stopping_rounds"] = early_stopping_rounds
     default_params.update(kwargs)
     
     model = XGBRegressor(**default_params)
-    model.fit(X_train, y_train)
+    model.fit(X_train, y_train, eval_set=eval_set, verbose=False)
     return model
 
 
@@ -93,13 +114,31 @@ def evaluate_model(y_true, y_pred):
     --------
     dict : Dictionary of metrics
     """
+    y_true = np.asarray(y_true, dtype=np.float64)
+    y_pred = np.asarray(y_pred, dtype=np.float64)
+    
+    # One error array feeds every metric
+    err = y_true - y_pred
+    ae = np.abs(err)
+    ss_res = np.dot(err, err)
+    mean_actual = y_true.mean()
+    centered = y_true - mean_actual
+    ss_tot = np.dot(centered, centered)
+    
+    # Same conventions as sklearn: eps floor on |y| for MAPE, and R2 of
+    # 1.0 (perfect fit) or 0.0 when y_true is constant
+    if ss_tot != 0:
+        r2 = 1 - ss_res / ss_tot
+    else:
+        r2 = 1.0 if ss_res == 0 else 0.0
+    
     metrics = {
-        "MAPE": mean_absolute_percentage_error(y_true, y_pred) * 100,
-        "MAE": mean_absolute_error(y_true, y_pred),
-        "RMSE": np.sqrt(mean_squared_error(y_true, y_pred)),
-        "R2": r2_score(y_true, y_pred),
-        "Mean_Actual": np.mean(y_true),
-        "Mean_Predicted": np.mean(y_pred)
+        "MAPE": (ae / np.maximum(np.abs(y_true), np.finfo(np.float64).eps)).mean() * 100,
+        "MAE": ae.mean(),
+        "RMSE": np.sqrt(ss_res / len(err)),
+        "R2": r2,
+        "Mean_Actual": mean_actual,
+        "Mean_Predicted": y_pred.mean()
     }
     
     # Additional business metrics
@@ -108,6 +147,55 @@ def evaluate_model(y_true, y_pred):
     return metrics
 
 
+def _apply_scenario_numpy(dst, src, promo_idx, oil_idx, promo_mult, oil_mult):
+    np.copyto(dst, src)
+    dst[:, promo_idx] *= promo_mult
+    dst[:, oil_idx] *= oil_mult
+    return dst
+
+
+if njit is not None:
+    @njit(fastmath=True, cache=True)
+    def _apply_scenario_numba(dst, src, promo_idx, oil_idx, promo_mult, oil_mult):
+        # Copy and scale in a single pass over the rows
+        for i in range(src.shape[0]):
+            for j in range(src.shape[1]):
+                dst[i, j] = src[i, j]
+            dst[i, promo_idx] *= promo_mult
+            dst[i, oil_idx] *= oil_mult
+        return dst
+else:
+    _apply_scenario_numba = None
+
+
+def apply_scenario(dst, src, promo_idx, oil_idx, promo_mult, oil_mult):
+    """
+    Write a scenario-adjusted copy of a feature matrix into a preallocated buffer.
+    
+    Parameters:
+    -----------
+    dst : np.ndarray
+        Preallocated output buffer with the same shape and dtype as ``src``
+    src : np.ndarray
+        2-D feature matrix
+    promo_idx : int
+        Column index of the promotion feature
+    oil_idx : int
+        Column index of the oil price feature
+    promo_mult : float
+        Multiplier applied to the promotion column
+    oil_mult : float
+        Multiplier applied to the oil price column
+        
+    Returns:
+    --------
+    np.ndarray : ``dst``, filled with the adjusted features
+    """
+    if _apply_scenario_numba is not None:
+        return _apply_scenario_numba(dst, src, promo_idx, oil_idx, promo_mult, oil_mult)
+    return _apply_scenario_numpy(dst, src, promo_idx, oil_idx, promo_mult, oil_mult)
+
+
 def get_feature_importance(model, feature_names):
     """
     Extract feature importance from trained model.
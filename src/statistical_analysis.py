@@ -10,7 +10,28 @@ from scipy import stats
 from statsmodels.tsa.stattools import adfuller
 from statsmodels.stats.diagnostic import acorr_ljungbox
 import warnings
+from functools import lru_cache
 warnings.filterwarnings('ignore')
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+try:
+    from joblib import Parallel, delayed
+except ImportError:
+    Parallel = None
+
+
+@lru_cache(maxsize=256)
+def _t_crit(confidence, df):
+    """Two-sided Student t critical value, cached by (confidence, df)."""
+    return float(stats.t.ppf((1 + confidence) / 2, df))
+
+
+@lru_cache(maxsize=64)
+def _z_crit(confidence):
+    """Two-sided normal critical value, cached by confidence."""
+    return float(stats.norm.ppf((1 + confidence) / 2))
 
 
 def calculate_confidence_interval(values, confidence=0.95):
@@ -28,10 +49,17 @@ def calculate_confidence_interval(values, confidence=0.95):
     --------
     tuple : (lower_bound, upper_bound, mean, std_error)
     """
-    values = np.array(values)
-    mean = np.mean(values)
-    std_err = stats.sem(values)
-    h = std_err * stats.t.ppf((1 + confidence) / 2, len(values) - 1)
+    values = np.asarray(values, dtype=np.float64)
+    n = values.size
+    
+    # No spread can be estimated from fewer than two values
+    if n < 2:
+        mean = values.mean() if n else np.nan
+        return mean, mean, mean, 0.0
+    
+    mean = values.mean()
+    std_err = values.std(ddof=1) / np.sqrt(n)
+    h = std_err * _t_crit(confidence, n - 1)
     
     return mean - h, mean + h, mean, std_err
 
@@ -50,26 +78,32 @@ def test_promotion_impact(df):
     dict : Statistical test results
     """
     # Create binary promotion indicator
-    promo_days = df[df['promo_count'] > 0]['sales']
-    no_promo_days = df[df['promo_count'] == 0]['sales']
+    sales = df['sales'].to_numpy(dtype=np.float64)
+    promo_count = df['promo_count'].to_numpy()
+    promo_days = sales[promo_count > 0]
+    no_promo_days = sales[promo_count == 0]
     
     if len(promo_days) == 0 or len(no_promo_days) == 0:
         return {"error": "Insufficient data for comparison"}
     
+    # Group moments once; the t-test and Cohen's d both reuse them
+    promo_mean, promo_var, n_promo = promo_days.mean(), promo_days.var(ddof=1), promo_days.size
+    no_promo_mean, no_promo_var, n_no_promo = no_promo_days.mean(), no_promo_days.var(ddof=1), no_promo_days.size
+    
     # Perform t-test
-    t_stat, p_value = stats.ttest_ind(promo_days, no_promo_days)
+    t_stat, p_value = stats.ttest_ind_from_stats(
+        promo_mean, np.sqrt(promo_var), n_promo,
+        no_promo_mean, np.sqrt(no_promo_var), n_no_promo,
+        equal_var=True
+    )
     
-    # Calculate effect size (Cohen's d)
-    pooled_std = np.sqrt(((len(promo_days) - 1) * promo_days.std()**2 + 
-                          (len(no_promo_days) - 1) * no_promo_days.std()**2) / 
-                         (len(promo_days) + len(no_promo_days) - 2))
-    cohens_d = (promo_days.mean() - no_promo_days.mean()) / pooled_std
-    
-    # Calculate means
-    promo_mean = promo_days.mean()
-    no_promo_mean = no_promo_days.mean()
     lift = ((promo_mean - no_promo_mean) / no_promo_mean) * 100
     
+    # Calculate effect size (Cohen's d)
+    pooled_std = np.sqrt(((n_promo - 1) * promo_var + (n_no_promo - 1) * no_promo_var) / 
+                         (n_promo + n_no_promo - 2))
+    cohens_d = (promo_mean - no_promo_mean) / pooled_std
+    
     return {
         "t_statistic": t_stat,
         "p_value": p_value,
@@ -95,18 +129,23 @@ def test_holiday_impact(df):
     --------
     dict : Statistical test results
     """
-    holiday_days = df[df['is_holiday'] == 1]['sales']
-    regular_days = df[df['is_holiday'] == 0]['sales']
+    sales = df['sales'].to_numpy(dtype=np.float64)
+    is_holiday = df['is_holiday'].to_numpy()
+    holiday_days = sales[is_holiday == 1]
+    regular_days = sales[is_holiday == 0]
     
     if len(holiday_days) == 0:
         return {"error": "No holiday data available"}
     
-    # Perform t-test
-    t_stat, p_value = stats.ttest_ind(holiday_days, regular_days)
-    
-    # Calculate means and lift
+    # Calculate means, then the t-test from the group moments
     holiday_mean = holiday_days.mean()
     regular_mean = regular_days.mean()
+    t_stat, p_value = stats.ttest_ind_from_stats(
+        holiday_mean, holiday_days.std(ddof=1), holiday_days.size,
+        regular_mean, regular_days.std(ddof=1), regular_days.size,
+        equal_var=True
+    )
+    
     lift = ((holiday_mean - regular_mean) / regular_mean) * 100 if regular_mean > 0 else 0
     
     return {
@@ -139,25 +178,58 @@ def calculate_correlations(df, target_col='sales', top_n=10):
     numeric_cols = df.select_dtypes(include=[np.number]).columns
     numeric_cols = [col for col in numeric_cols if col != target_col]
     
-    correlations = []
-    p_values = []
+    # All feature-target correlations at once over pairwise-complete rows,
+    # with p-values from the t-distribution (same test pearsonr performs)
+    X = df[numeric_cols].to_numpy(dtype=np.float64)
+    y = df[target_col].to_numpy(dtype=np.float64)[:, None]
+    valid = ~np.isnan(X) & ~np.isnan(y)
+    n = valid.sum(axis=0)
     
-    for col in numeric_cols:
-        if df[col].notna().sum() > 10:  # Minimum data points
-            corr, p_val = stats.pearsonr(df[target_col].dropna(), df[col].dropna())
-            correlations.append(corr)
-            p_values.append(p_val)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if valid.all():
+            # No missing values: every column shares the same rows, so one
+            # centered target and a single GEMV give all cross products
+            x_dev = X - X.mean(axis=0)
+            y_dev = y[:, 0] - y.mean()
+            correlations = (x_dev.T @ y_dev) / np.sqrt(
+                np.einsum('ij,ij->j', x_dev, x_dev) * (y_dev @ y_dev)
+            )
         else:
-            correlations.append(np.nan)
-            p_values.append(np.nan)
+            # Center each pair on its own complete rows before taking moments
+            x_dev = np.where(valid, X, 0.0)
+            y_dev = np.where(valid, y, 0.0)
+            x_dev -= np.where(valid, x_dev.sum(axis=0) / n, 0.0)
+            y_dev -= np.where(valid, y_dev.sum(axis=0) / n, 0.0)
+            correlations = (x_dev * y_dev).sum(axis=0) / np.sqrt(
+                (x_dev * x_dev).sum(axis=0) * (y_dev * y_dev).sum(axis=0)
+            )
+        correlations = np.clip(correlations, -1.0, 1.0)
+        t_stat = correlations * np.sqrt((n - 2) / (1 - correlations**2))
+        p_values = 2 * stats.t.sf(np.abs(t_stat), n - 2)
+    
+    # Minimum data points
+    too_sparse = n <= 10
+    correlations[too_sparse] = np.nan
+    p_values[too_sparse] = np.nan
+    
+    significant = p_values < 0.05
+    strength = np.where(np.isnan(correlations), 0.0, np.abs(correlations))
+    
+    # Top-N by strength: partition, then sort only the k survivors
+    k = max(0, min(top_n, strength.size))
+    if 0 < k < strength.size:
+        idx = np.argpartition(-strength, k - 1)[:k]
+    else:
+        idx = np.arange(k)
+    idx = idx[np.argsort(-strength[idx], kind='stable')]
     
     corr_df = pd.DataFrame({
-        'Feature': numeric_cols,
-        'Correlation': correlations,
-        'P_Value': p_values,
-        'Significant': [p < 0.05 for p in p_values],
-        'Strength': [abs(c) if not np.isnan(c) else 0 for c in correlations]
-    }).sort_values('Strength', ascending=False).head(top_n)
+        'Feature': np.asarray(numeric_cols, dtype=object)[idx],
+        'Correlation': correlations[idx],
+        'P_Value': p_values[idx],
+        'Significant': significant[idx],
+        'Strength': strength[idx]
+    }, index=idx)
     
     return corr_df
 
@@ -194,6 +266,32 @@ def test_stationarity(series, alpha=0.05):
         return {"error": str(e)}
 
 
+def test_stationarity_batch(series_list, alpha=0.05, n_jobs=-1):
+    """
+    Run the ADF stationarity test over many series in parallel.
+    
+    Parameters:
+    -----------
+    series_list : iterable of pd.Series
+        Time series to test (e.g. one per store or product family)
+    alpha : float
+        Significance level
+    n_jobs : int
+        Number of worker processes (-1 uses all cores)
+        
+    Returns:
+    --------
+    list of dict : test_stationarity results, in input order
+    """
+    # adfuller is CPU-bound OLS work, so each series gets its own process;
+    # without joblib the series are tested serially
+    if Parallel is None or n_jobs == 1:
+        return [test_stationarity(series, alpha) for series in series_list]
+    return Parallel(n_jobs=n_jobs, prefer='processes')(
+        delayed(test_stationarity)(series, alpha) for series in series_list
+    )
+
+
 def forecast_confidence_intervals(forecasts, historical_errors, confidence=0.95):
     """
     Calculate confidence intervals for forecasts based on historical errors.
@@ -209,30 +307,78 @@ def forecast_confidence_intervals(forecasts, historical_errors, confidence=0.95)
         
     Returns:
     --------
-    pd.DataFrame : Forecasts with confidence intervals
+    pd.DataFrame : Forecasts with confidence intervals; the confidence
+        level is stored in ``result_df.attrs['confidence_level']``
     """
-    forecasts = np.array(forecasts)
-    historical_errors = np.array(historical_errors)
+    forecasts = np.asarray(forecasts, dtype=np.float64)
+    historical_errors = np.asarray(historical_errors, dtype=np.float64)
     
     # Calculate error distribution statistics
     error_std = np.std(historical_errors)
-    error_mean = np.mean(historical_errors)
     
     # Calculate confidence interval width
-    z_score = stats.norm.ppf((1 + confidence) / 2)
+    z_score = _z_crit(confidence)
     margin = z_score * error_std
     
-    # Create dataframe with intervals
-    result_df = pd.DataFrame({
-        'forecast': forecasts,
-        'lower_bound': forecasts - margin,
-        'upper_bound': forecasts + margin,
-        'confidence_level': confidence
-    })
+    # Fill one preallocated block and wrap it; the confidence level is the
+    # same for every row, so it is kept in attrs rather than as a column
+    out = np.empty((forecasts.size, 3), dtype=np.float64)
+    out[:, 0] = forecasts
+    np.subtract(forecasts, margin, out=out[:, 1])
+    np.add(forecasts, margin, out=out[:, 2])
+    result_df = pd.DataFrame(out, columns=['forecast', 'lower_bound', 'upper_bound'])
+    result_df.attrs['confidence_level'] = confidence
     
     return result_df
 
 
+def _accuracy_stats_numpy(actual, predicted, abs_errors):
+    errors = actual - predicted
+    np.abs(errors, out=abs_errors)
+    mean = errors.mean()
+    centered = errors - mean
+    return (
+        abs_errors.sum(),
+        np.dot(errors, errors),
+        (abs_errors / (actual + 1)).sum(),
+        abs_errors.max(),
+        abs_errors.min(),
+        mean,
+        np.dot(centered, centered)
+    )
+
+
+if njit is not None:
+    @njit(cache=True)
+    def _accuracy_stats_numba(actual, predicted, abs_errors):
+        # One pass: running sums, extrema and a Welford mean/M2 of the errors
+        sum_abs = 0.0
+        sum_sq = 0.0
+        sum_pct = 0.0
+        max_abs = -np.inf
+        min_abs = np.inf
+        mean = 0.0
+        m2 = 0.0
+        for i in range(actual.shape[0]):
+            err = actual[i] - predicted[i]
+            abs_err = abs(err)
+            abs_errors[i] = abs_err
+            sum_abs += abs_err
+            sum_sq += err * err
+            sum_pct += abs_err / (actual[i] + 1)
+            # A NaN error sticks, as it does for np.max/np.min
+            if abs_err > max_abs or abs_err != abs_err:
+                max_abs = abs_err
+            if abs_err < min_abs or abs_err != abs_err:
+                min_abs = abs_err
+            delta = err - mean
+            mean += delta / (i + 1)
+            m2 += delta * (err - mean)
+        return sum_abs, sum_sq, sum_pct, max_abs, min_abs, mean, m2
+else:
+    _accuracy_stats_numba = None
+
+
 def calculate_forecast_accuracy_metrics(actual, predicted):
     """
     Calculate comprehensive forecast accuracy metrics.
@@ -248,28 +394,36 @@ def calculate_forecast_accuracy_metrics(actual, predicted):
     --------
     dict : Comprehensive metrics
     """
-    actual = np.array(actual)
-    predicted = np.array(predicted)
+    actual = np.ascontiguousarray(actual, dtype=np.float64)
+    predicted = np.ascontiguousarray(predicted, dtype=np.float64)
+    n = len(actual)
     
-    errors = actual - predicted
-    abs_errors = np.abs(errors)
-    pct_errors = abs_errors / (actual + 1) * 100
+    # Every sum-based metric comes from one traversal; the absolute errors
+    # are kept only for the median
+    abs_errors = np.empty(n)
+    accuracy_stats = _accuracy_stats_numba or _accuracy_stats_numpy
+    sum_abs, sum_sq, sum_pct, max_abs, min_abs, mean_error, m2 = map(
+        np.float64, accuracy_stats(actual, predicted, abs_errors)
+    )
     
     metrics = {
-        "MAE": np.mean(abs_errors),
-        "RMSE": np.sqrt(np.mean(errors**2)),
-        "MAPE": np.mean(pct_errors),
-        "Mean_Error": np.mean(errors),
-        "Std_Error": np.std(errors),
-        "Max_Error": np.max(abs_errors),
-        "Min_Error": np.min(abs_errors),
+        "MAE": sum_abs / n,
+        "RMSE": np.sqrt(sum_sq / n),
+        "MAPE": sum_pct / n * 100,
+        "Mean_Error": mean_error,
+        "Std_Error": np.sqrt(m2 / n),
+        "Max_Error": max_abs,
+        "Min_Error": min_abs,
         "Median_Abs_Error": np.median(abs_errors)
     }
     
-    # Add confidence intervals for accuracy
-    ci_lower, ci_upper, mean_err, std_err = calculate_confidence_interval(errors)
-    metrics["Error_CI_Lower"] = ci_lower
-    metrics["Error_CI_Upper"] = ci_upper
+    # Add confidence intervals for accuracy (same t-interval as
+    # calculate_confidence_interval, from the stats above)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        std_err = np.sqrt(m2 / (n - 1) / n)
+    h = std_err * _t_crit(0.95, n - 1)
+    metrics["Error_CI_Lower"] = mean_error - h
+    metrics["Error_CI_Upper"] = mean_error + h
     
     return metrics
 
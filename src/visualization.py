@@ -12,10 +12,15 @@ try:
     from scipy import stats
 except ImportError:
     stats = None
+try:
+    from plotly_resampler import FigureResampler
+except ImportError:
+    FigureResampler = None
 
 
 def plot_forecast_comparison(train_dates, train_values, test_dates, 
-                            actual_values, predicted_values, title="Revenue Forecast"):
+                            actual_values, predicted_values, title="Revenue Forecast",
+                            use_webgl=True):
     """
     Create interactive forecast comparison plot.
     
@@ -33,35 +38,44 @@ def plot_forecast_comparison(train_dates, train_values, test_dates,
         Predicted test values
     title : str
         Plot title
+    use_webgl : bool
+        Render traces with WebGL (Scattergl) instead of SVG; keeps
+        pan/zoom responsive on long training histories
         
     Returns:
     --------
     plotly.graph_objects.Figure
     """
-    fig = go.Figure()
+    scatter = go.Scattergl if use_webgl else go.Scatter
+    # Downsample long traces (MinMaxLTTB) so large histories don't bloat the
+    # browser payload; only this time-ordered figure is resampled
+    if FigureResampler is not None:
+        fig = FigureResampler(go.Figure(), default_n_shown_samples=2000)
+    else:
+        fig = go.Figure()
     
     # Training data
-    fig.add_trace(go.Scatter(
+    fig.add_trace(scatter(
         x=train_dates,
-        y=train_values,
+        y=np.asarray(train_values, dtype=np.float32),
         name="Training Data",
         line=dict(color="#1f77b4", width=1),
         opacity=0.6
     ))
     
     # Actual test data
-    fig.add_trace(go.Scatter(
+    fig.add_trace(scatter(
         x=test_dates,
-        y=actual_values,
+        y=np.asarray(actual_values, dtype=np.float32),
         name="Actual",
         line=dict(color="#000000", width=2),
         mode='lines+markers'
     ))
     
     # Predicted
-    fig.add_trace(go.Scatter(
+    fig.add_trace(scatter(
         x=test_dates,
-        y=predicted_values,
+        y=np.asarray(predicted_values, dtype=np.float32),
         name="Forecast",
         line=dict(color="#ff7f0e", width=2, dash='dash'),
         mode='lines+markers'
@@ -99,6 +113,13 @@ def plot_residuals(actual, predicted, title="Residual Analysis"):
     """
     residuals = actual - predicted
     
+    # float32 halves the serialized payload; the scatters are also thinned
+    # to at most 2000 points, which is visually indistinguishable
+    actual32 = np.asarray(actual, dtype=np.float32)
+    predicted32 = np.asarray(predicted, dtype=np.float32)
+    residuals32 = np.asarray(residuals, dtype=np.float32)
+    step = max(1, -(-len(residuals32) // 2000))
+    
     fig = make_subplots(
         rows=2, cols=2,
         subplot_titles=("Residuals Over Time", "Residual Distribution", 
@@ -107,58 +128,66 @@ def plot_residuals(actual, predicted, title="Residual Analysis"):
                [{"secondary_y": False}, {"secondary_y": False}]]
     )
     
+    # Collect every trace with its subplot cell and add them in one call
+    traces, rows, cols = [], [], []
+    
     # Residuals over time
-    fig.add_trace(
-        go.Scatter(x=list(range(len(residuals))), y=residuals, mode='markers',
-                  marker=dict(color='blue', size=4)),
-        row=1, col=1
-    )
-    fig.add_hline(y=0, line_dash="dash", line_color="red", row=1, col=1)
+    traces.append(go.Scatter(x=np.arange(0, len(residuals32), step), y=residuals32[::step],
+                             mode='markers', marker=dict(color='blue', size=4)))
+    rows.append(1); cols.append(1)
     
-    # Residual distribution
-    fig.add_trace(
-        go.Histogram(x=residuals, nbinsx=30, marker_color='blue'),
-        row=1, col=2
-    )
+    # Residual distribution, binned here so only 30 bars are serialized
+    finite = residuals32[np.isfinite(residuals32)]
+    counts, edges = np.histogram(finite, bins=30)
+    traces.append(go.Bar(x=0.5 * (edges[:-1] + edges[1:]), y=counts, width=np.diff(edges),
+                         marker_color='blue'))
+    rows.append(1); cols.append(2)
     
     # Actual vs Predicted
-    fig.add_trace(
-        go.Scatter(x=actual, y=predicted, mode='markers',
-                  marker=dict(color='green', size=4)),
-        row=2, col=1
-    )
-    # Perfect prediction line
-    min_val = min(min(actual), min(predicted))
-    max_val = max(max(actual), max(predicted))
-    fig.add_trace(
-        go.Scatter(x=[min_val, max_val], y=[min_val, max_val],
-                  mode='lines', line=dict(color='red', dash='dash')),
-        row=2, col=1
-    )
+    traces.append(go.Scatter(x=actual32[::step], y=predicted32[::step], mode='markers',
+                             marker=dict(color='green', size=4)))
+    rows.append(2); cols.append(1)
     
-    # Q-Q plot (simplified)
+    # Q-Q plot (simplified): Blom plotting positions against normal
+    # quantiles, with the reference line mean + std * z
     if stats is not None:
         try:
-            qq = stats.probplot(residuals, dist="norm")
-            fig.add_trace(
-                go.Scatter(x=qq[0][0], y=qq[0][1], mode='markers',
-                          marker=dict(color='purple', size=4)),
-                row=2, col=2
-            )
-            fig.add_trace(
-                go.Scatter(x=qq[0][0], y=qq[1][1] + qq[1][0] * qq[0][0],
-                          mode='lines', line=dict(color='red')),
-                row=2, col=2
-            )
+            sorted_residuals = np.sort(np.asarray(residuals, dtype=np.float64))
+            n = sorted_residuals.size
+            theoretical = stats.norm.ppf((np.arange(1, n + 1) - 0.375) / (n + 0.25))
+            slope, intercept = sorted_residuals.std(ddof=1), sorted_residuals.mean()
+            line_x = theoretical[[0, -1]]
+            qq_traces = [
+                go.Scatter(x=theoretical[::step].astype(np.float32),
+                           y=sorted_residuals[::step].astype(np.float32),
+                           mode='markers', marker=dict(color='purple', size=4)),
+                go.Scatter(x=line_x, y=intercept + slope * line_x,
+                           mode='lines', line=dict(color='red'))
+            ]
+            traces.extend(qq_traces)
+            rows.extend([2, 2]); cols.extend([2, 2])
         except:
             # If Q-Q plot fails, show empty subplot
             pass
     
+    fig.add_traces(traces, rows=rows, cols=cols)
+    
+    # Zero line on the residuals panel as a prebuilt shape (what add_hline
+    # would generate) so the layout is updated once
+    zero_line = dict(type='line', xref='x domain', yref='y', x0=0, x1=1, y0=0, y1=0,
+                     line=dict(color='red', dash='dash'))
+    # Perfect prediction line on the actual vs predicted panel
+    lo = float(min(actual32.min(), predicted32.min()))
+    hi = float(max(actual32.max(), predicted32.max()))
+    perfect_line = dict(type='line', xref='x3', yref='y3', x0=lo, y0=lo, x1=hi, y1=hi,
+                        line=dict(color='red', dash='dash'))
+    
     fig.update_layout(
         title=dict(text=title, font=dict(size=18)),
         height=700,
         showlegend=False,
-        template="plotly_white"
+        template="plotly_white",
+        shapes=[zero_line, perfect_line]
     )
     
     fig.update_xaxes(title_text="Index", row=1, col=1)
@@ -223,16 +252,21 @@ def plot_seasonality_analysis(df):
     --------
     plotly.graph_objects.Figure
     """
-    df_analysis = df.copy()
-    df_analysis["month"] = df_analysis.index.month
-    df_analysis["day_of_week"] = df_analysis.index.dayofweek
-    df_analysis["week"] = df_analysis.index.isocalendar().week
+    sales = df["sales"].to_numpy(dtype=np.float64)
+    valid = ~np.isnan(sales)
+    sales = sales[valid]
+    months = df.index.month.to_numpy()[valid]
+    dows = df.index.dayofweek.to_numpy()[valid]
     
-    # Monthly pattern
-    monthly = df_analysis.groupby("month")["sales"].mean()
+    # Monthly and weekly means as bincount sums over counts; periods with
+    # no observations are dropped, as groupby would
+    month_counts = np.bincount(months, minlength=13)
+    month_idx = np.flatnonzero(month_counts[1:]) + 1
+    monthly = np.bincount(months, weights=sales, minlength=13)[month_idx] / month_counts[month_idx]
     
-    # Weekly pattern
-    weekly = df_analysis.groupby("day_of_week")["sales"].mean()
+    dow_counts = np.bincount(dows, minlength=7)
+    dow_idx = np.flatnonzero(dow_counts)
+    weekly = np.bincount(dows, weights=sales, minlength=7)[dow_idx] / dow_counts[dow_idx]
     
     fig = make_subplots(
         rows=1, cols=2,
@@ -240,12 +274,12 @@ def plot_seasonality_analysis(df):
     )
     
     fig.add_trace(
-        go.Bar(x=monthly.index, y=monthly.values, marker_color="steelblue"),
+        go.Bar(x=month_idx, y=monthly.astype(np.float32), marker_color="steelblue"),
         row=1, col=1
     )
     
     fig.add_trace(
-        go.Bar(x=weekly.index, y=weekly.values, marker_color="coral"),
+        go.Bar(x=dow_idx, y=weekly.astype(np.float32), marker_color="coral"),
         row=1, col=2
     )
     
@@ -0,0 +1,46 @@
+"""
+Regression checks for the visualization module.
+"""
+
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.visualization import plot_residuals
+
+try:
+    from plotly_resampler import register_plotly_resampler, unregister_plotly_resampler
+except ImportError:
+    register_plotly_resampler = None
+
+
+class PlotResidualsTest(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.actual = rng.random(4500) * 100
+        self.predicted = self.actual + rng.normal(size=self.actual.size)
+
+    def test_traces_are_capped(self):
+        fig = plot_residuals(self.actual, self.predicted)
+        for trace in fig.data:
+            self.assertLessEqual(len(trace.x), 2000)
+
+    @unittest.skipIf(register_plotly_resampler is None, "plotly-resampler not installed")
+    def test_builds_under_registered_resampler(self):
+        # FigureResampler asserts sorted x on traces above its sample
+        # threshold; the unsorted residual scatters must stay below it
+        register_plotly_resampler(mode="auto", default_n_shown_samples=2000)
+        try:
+            fig = plot_residuals(self.actual, self.predicted)
+        finally:
+            unregister_plotly_resampler()
+        self.assertEqual(len(fig.data), 5)
+
+
+if __name__ == "__main__":
+    unittest.main()